@@ -1,7 +1,5 @@
 import click
-from core.feed_manager import FeedManager
-
-feed_manager = FeedManager()
+from cli.manager import get_feed_manager
 
 
 @click.group()
@@ -13,6 +11,7 @@ def category():
 @category.command()
 def list():
     """List all categories"""
+    feed_manager = get_feed_manager()
     categories = feed_manager.get_categories()
     if categories:
         click.echo("\nAvailable categories:")
@@ -26,6 +25,7 @@ def list():
 @click.argument("name")
 def add(name):
     """Add a new category"""
+    feed_manager = get_feed_manager()
     if feed_manager.add_category(name):
         click.echo(f"Successfully added category: {name}")
     else:
@@ -36,6 +36,7 @@ def add(name):
 @click.argument("name")
 def remove(name):
     """Remove a category and move its entries to Uncategorized"""
+    feed_manager = get_feed_manager()
     if name.lower() == "uncategorized":
         click.echo("Cannot remove the Uncategorized category")
         return
@@ -49,6 +50,7 @@ def remove(name):
 @click.argument("file_path", type=click.Path(exists=True))
 def import_from_file(file_path):
     """Import categories from a file"""
+    feed_manager = get_feed_manager()
     try:
         with open(file_path, "r") as f:
             categories = [line.strip() for line in f if line.strip()]
@@ -0,0 +1,100 @@
+import click
+from cli.manager import get_feed_manager
+
+
+@click.group()
+def db():
+    """Maintain the entries database"""
+    pass
+
+
+def _describe(policy):
+    rules = []
+    if policy["keep_days"] is not None:
+        rules.append(f"keep {policy['keep_days']} days")
+    if policy["keep_read_days"] is not None:
+        rules.append(f"keep read entries {policy['keep_read_days']} days")
+    if policy["content_days"] is not None:
+        rules.append(f"drop content after {policy['content_days']} days")
+    return ", ".join(rules) or "keep forever"
+
+
+@db.command()
+def retention():
+    """List retention policies"""
+    feed_manager = get_feed_manager()
+    policies = feed_manager.get_retention_policies()
+    if policies:
+        click.echo("\nRetention policies:")
+        for policy in policies:
+            target = (
+                f"feed {policy['feed_url']}"
+                if policy["feed_url"]
+                else f"category {policy['category']}"
+            )
+            click.echo(f"- {target}: {_describe(policy)}")
+    else:
+        click.echo("No retention policies set, all entries are kept")
+
+
+@db.command()
+@click.option("--feed", "feed_url", help="URL of the feed the policy applies to")
+@click.option("--category", help="Category the policy applies to")
+@click.option("--keep-days", type=int, help="Delete entries older than this")
+@click.option("--keep-read-days", type=int, help="Delete read entries older than this")
+@click.option(
+    "--drop-content-days",
+    type=int,
+    help="Drop the content of entries older than this, keeping title and link",
+)
+def set_retention(feed_url, category, keep_days, keep_read_days, drop_content_days):
+    """Set the retention policy of a feed or category
+
+    A feed's policy takes precedence over its entries' category policy.
+    """
+    feed_manager = get_feed_manager()
+    if bool(feed_url) == bool(category):
+        click.echo("Specify exactly one of --feed or --category")
+        return
+    target = feed_url or category
+    if feed_manager.set_retention_policy(
+        feed_url, category, keep_days, keep_read_days, drop_content_days
+    ):
+        click.echo(f"Successfully set retention policy for {target}")
+    else:
+        click.echo(f"Failed to set retention policy for {target}")
+
+
+@db.command()
+@click.option("--feed", "feed_url", help="URL of the feed")
+@click.option("--category", help="Name of the category")
+def clear_retention(feed_url, category):
+    """Remove the retention policy of a feed or category"""
+    feed_manager = get_feed_manager()
+    if bool(feed_url) == bool(category):
+        click.echo("Specify exactly one of --feed or --category")
+        return
+    target = feed_url or category
+    if feed_manager.remove_retention_policy(feed_url, category):
+        click.echo(f"Successfully removed retention policy for {target}")
+    else:
+        click.echo(f"No retention policy found for {target}")
+
+
+@db.command()
+def compact():
+    """Apply retention policies and shrink the database file"""
+    feed_manager = get_feed_manager()
+    result = feed_manager.compact()
+    if result is None:
+        click.echo("Failed to compact the database")
+        return
+
+    click.echo(
+        f"Deleted {result['deleted']} entries, "
+        f"dropped the content of {result['stripped']}"
+    )
+    click.echo(
+        f"Database size: {result['size_before'] / 1024 / 1024:.1f} MB -> "
+        f"{result['size_after'] / 1024 / 1024:.1f} MB"
+    )
@@ -0,0 +1,75 @@
+import click
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from core.digest import DIGEST_FORMATS
+from cli.manager import get_feed_manager
+
+
+def _write_chunks(chunks: Iterable[str], path: Optional[str]) -> None:
+    """Write chunks to standard output, or replace path once all are written.
+
+    The file is written to a temporary file next to it and only renamed over
+    path on success, so a failed run leaves any previous digest in place.
+    """
+    if path is None:
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+        return
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".digest-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            for chunk in chunks:
+                out.write(chunk)
+        # mkstemp creates the file private to the user; give it the
+        # permissions a plain open would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@click.command()
+@click.option(
+    "--from",
+    "start",
+    type=click.DateTime(["%Y-%m-%d"]),
+    help="First day of the digest  [default: 6 days before --to, a 7 day digest]",
+)
+@click.option(
+    "--to", "end", type=click.DateTime(["%Y-%m-%d"]), help="Last day  [default: today]"
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(list(DIGEST_FORMATS)),
+    default="md",
+    show_default=True,
+    help="Output format",
+)
+@click.option(
+    "--out",
+    type=click.Path(dir_okay=False),
+    help="File to write the digest to  [default: standard output]",
+)
+def digest(start, end, output_format, out):
+    """Write a digest of the entries published in a date range
+
+    Entries are grouped by category and streamed from the database to the
+    output as they are read, so the digest is never held in memory.
+    """
+    end = end.date() if end else date.today()
+    start = start.date() if start else end - timedelta(days=6)
+    if start > end:
+        raise click.BadParameter("must not be after --to", param_hint="--from")
+
+    entries = get_feed_manager().iter_digest_entries(start, end)
+    _write_chunks(DIGEST_FORMATS[output_format](entries, start, end), out)
@@ -0,0 +1,139 @@
+import click
+from datetime import datetime
+from itertools import islice
+from cli.manager import get_feed_manager
+
+
+@click.group()
+def entry():
+    """Browse feed entries"""
+    pass
+
+
+@entry.command()
+@click.option("--feed", "feed_url", help="Only show entries of the feed with this URL")
+@click.option("--category", help="Only show entries in this category")
+@click.option("--unread", is_flag=True, help="Only show unread entries")
+@click.option(
+    "--from", "start", type=click.DateTime(["%Y-%m-%d"]), help="Earliest publish date"
+)
+@click.option(
+    "--to", "end", type=click.DateTime(["%Y-%m-%d"]), help="Latest publish date"
+)
+@click.option("--oldest-first", is_flag=True, help="List the oldest entries first")
+@click.option("--limit", type=int, help="Maximum number of entries to show")
+def list(feed_url, category, unread, start, end, oldest_first, limit):
+    """List entries, newest first"""
+    feed_manager = get_feed_manager()
+    filters = {"feed_url": feed_url, "category": category, "unread_only": unread}
+    if start:
+        filters["start"] = start.date()
+    if end:
+        filters["end"] = end.date()
+
+    entries = feed_manager.iter_entries(
+        filters, order="asc" if oldest_first else "desc", summaries=True
+    )
+    count = 0
+    for entry in islice(entries, limit):
+        published = (
+            datetime.fromtimestamp(entry["published_ts"]).strftime("%Y-%m-%d %H:%M")
+            if entry["published_ts"] is not None
+            else "undated"
+        )
+        marker = "*" if not entry["is_read"] else " "
+        click.echo(
+            f"{marker} {published}  [{entry['category']}] "
+            f"{entry['feed_title']} - {entry['title']}"
+        )
+        click.echo(f"    {entry['link']}")
+        count += 1
+
+    if not count:
+        click.echo("No entries found")
+
+
+@entry.command()
+@click.argument("query")
+@click.option(
+    "--limit", default=20, show_default=True, help="Maximum number of results"
+)
+def search(query, limit):
+    """Search entry titles, descriptions and content"""
+    feed_manager = get_feed_manager()
+    results = feed_manager.search(query, limit)
+    if not results:
+        click.echo("No matching entries found")
+        return
+
+    for result in results:
+        click.echo(f"{result['feed_title']} - {result['title']}")
+        click.echo(f"    {result['link']}")
+        click.echo(f"    {' '.join(result['snippet'].split())}")
+
+
+@entry.command()
+@click.argument("category_name")
+@click.argument("entries", nargs=-1)
+@click.option("--feed", "feed_url", help="Move entries of the feed with this URL")
+@click.option("--category", help="Move entries currently in this category")
+@click.option("--unread", is_flag=True, help="Only move unread entries")
+@click.option(
+    "--from", "start", type=click.DateTime(["%Y-%m-%d"]), help="Earliest publish date"
+)
+@click.option(
+    "--to", "end", type=click.DateTime(["%Y-%m-%d"]), help="Latest publish date"
+)
+def set_category(category_name, entries, feed_url, category, unread, start, end):
+    """Move entries to CATEGORY_NAME
+
+    ENTRIES are entry ids or links. Without them, every entry matching the
+    filter options is moved.
+    """
+    feed_manager = get_feed_manager()
+    filters = None
+    if feed_url or category or unread or start or end:
+        if entries:
+            click.echo("Give either entries or filter options, not both")
+            return
+        filters = {"feed_url": feed_url, "category": category, "unread_only": unread}
+        if start:
+            filters["start"] = start.date()
+        if end:
+            filters["end"] = end.date()
+    elif not entries:
+        click.echo("Give the entries to move or filter options to select them")
+        return
+
+    links_or_ids = [int(item) if item.isdigit() else item for item in entries]
+    moved = feed_manager.set_entries_category(links_or_ids, category_name, filters)
+    if moved is None:
+        click.echo(f"Failed to move entries to category: {category_name}")
+    else:
+        click.echo(f"Moved {moved} entries to {category_name}")
+
+
+@entry.command()
+@click.option("--feed", "feed_url", help="Mark entries of the feed with this URL")
+@click.option("--category", help="Mark entries in this category")
+@click.option(
+    "--until",
+    type=click.DateTime(["%Y-%m-%d"]),
+    help="Mark entries published up to and including this date",
+)
+@click.option("--all", "everything", is_flag=True, help="Mark every entry")
+@click.option("--unread", is_flag=True, help="Mark the entries unread instead")
+def mark_read(feed_url, category, until, everything, unread):
+    """Mark all entries of a feed, a category or up to a date as read"""
+    feed_manager = get_feed_manager()
+    if not (feed_url or category or until or everything):
+        click.echo("Give --feed, --category, --until or --all")
+        return
+
+    changed = feed_manager.mark_entries_read(
+        feed_url, category, until.date() if until else None, is_read=not unread
+    )
+    if changed is None:
+        click.echo("Failed to mark entries")
+    else:
+        click.echo(f"Marked {changed} entries as {'unread' if unread else 'read'}")
@@ -8,6 +8,9 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from cli.feed_commands import feed
 from cli.category_commands import category
+from cli.entry_commands import entry
+from cli.db_commands import db
+from cli.digest_commands import digest
 
 
 @click.group()
@@ -18,6 +21,9 @@ def cli():
 
 cli.add_command(feed)
 cli.add_command(category)
+cli.add_command(entry)
+cli.add_command(db)
+cli.add_command(digest)
 
 if __name__ == "__main__":
     cli()
@@ -1,8 +1,8 @@
 import click
 import json
-from core.feed_manager import FeedManager
-
-feed_manager = FeedManager()
+from datetime import datetime
+from core.scheduler import PollScheduler
+from cli.manager import get_feed_manager
 
 
 @click.group()
@@ -15,6 +15,7 @@ def feed():
 @click.argument("url")
 def add(url):
     """Add a new RSS feed"""
+    feed_manager = get_feed_manager()
     if feed_manager.add_feed(url):
         click.echo(f"Successfully added feed: {url}")
     else:
@@ -22,41 +23,120 @@ def add(url):
 
 
 @feed.command()
-def fetch():
+@click.option(
+    "--workers", default=8, show_default=True, help="Number of concurrent downloads"
+)
+@click.option(
+    "--per-host",
+    default=2,
+    show_default=True,
+    help="Maximum concurrent downloads from a single host",
+)
+@click.option(
+    "--processes",
+    default=0,
+    show_default=True,
+    help="Parse feeds in this many worker processes (0 parses in the download threads)",
+)
+def fetch(workers, per_host, processes):
     """Fetch all feed entries"""
+    feed_manager = get_feed_manager()
     feeds = feed_manager.get_feeds()
     if not feeds:
         click.echo("No feeds available")
         return
 
     total_entries = 0
-    for feed in feeds:
-        if not feed["enabled"]:
-            continue
-        try:
-            success, entry_count = feed_manager.refresh_feed(feed["url"])
-            if success:
-                total_entries += entry_count
-                click.echo(f"Fetched {entry_count} new entries from {feed['title']}")
-            else:
-                click.echo(f"Failed to fetch feed {feed['title']}")
-        except Exception as e:
-            click.echo(f"Failed to fetch feed {feed['title']}: {str(e)}")
+    not_modified = 0
+    unchanged = 0
+
+    def report(result):
+        nonlocal total_entries, not_modified, unchanged
+        if result["status"] == "not_modified":
+            not_modified += 1
+            click.echo(f"Not modified since last fetch: {result['title']}")
+        elif result["status"] == "unchanged":
+            unchanged += 1
+            click.echo(f"Unchanged since last fetch: {result['title']}")
+        elif result["success"]:
+            total_entries += result["count"]
+            details = []
+            if result["updated"]:
+                details.append(f"{result['updated']} updated")
+            if result["skipped"]:
+                details.append(f"{result['skipped']} skipped, link already stored")
+            details = f" ({', '.join(details)})" if details else ""
+            click.echo(
+                f"Fetched {result['count']} new entries from {result['title']}{details}"
+            )
+        elif result["error"]:
+            click.echo(f"Failed to fetch feed {result['title']}: {result['error']}")
+        else:
+            click.echo(f"Failed to fetch feed {result['title']}")
+
+    feed_manager.refresh_all(
+        max_workers=workers,
+        per_host_limit=per_host,
+        callback=report,
+        processes=processes,
+    )
 
     if total_entries > 0:
         click.echo(f"\nSuccessfully fetched {total_entries} new entries in total")
     else:
         click.echo("No new entries found")
+    if not_modified:
+        click.echo(f"{not_modified} feeds were not modified since the last fetch")
+    if unchanged:
+        click.echo(f"{unchanged} feeds returned the same content and were not parsed")
+
+
+@feed.command()
+@click.option(
+    "--workers", default=8, show_default=True, help="Number of concurrent downloads"
+)
+@click.option(
+    "--per-host",
+    default=2,
+    show_default=True,
+    help="Maximum concurrent downloads from a single host",
+)
+def daemon(workers, per_host):
+    """Keep polling feeds, each on a schedule learned from its publishing cadence"""
+    feed_manager = get_feed_manager()
+
+    def report(result):
+        next_poll = datetime.fromtimestamp(result["next_poll"]).strftime("%H:%M:%S")
+        if result["status"] == "not_modified":
+            status = "not modified"
+        elif result["status"] == "unchanged":
+            status = "unchanged"
+        elif result["success"]:
+            status = f"{result['count']} new entries"
+        else:
+            status = f"failed{': ' + result['error'] if result['error'] else ''}"
+        click.echo(f"{result['title']}: {status}, next poll at {next_poll}")
+
+    click.echo("Polling feeds, press Ctrl+C to stop")
+    try:
+        PollScheduler(feed_manager, workers, per_host).run(callback=report)
+    except KeyboardInterrupt:
+        click.echo("\nStopped polling feeds")
 
 
 @feed.command()
-def list():
+@click.option("--counts", is_flag=True, help="Show the number of unread entries")
+def list(counts):
     """List all feeds"""
+    feed_manager = get_feed_manager()
     feeds = feed_manager.get_feeds()
     if feeds:
+        unread_counts = feed_manager.get_unread_counts()["feeds"] if counts else {}
         click.echo("\nAvailable feeds:")
         for feed in feeds:
             status = "enabled" if feed["enabled"] else "disabled"
+            if counts:
+                status += f", {unread_counts.get(feed['url'], 0)} unread"
             click.echo(f"- {feed['title']} ({feed['url']}) [{status}]")
     else:
         click.echo("No feeds available")
@@ -66,6 +146,7 @@ def list():
 @click.argument("url")
 def remove(url):
     """Remove a feed"""
+    feed_manager = get_feed_manager()
     if feed_manager.remove_feed(url):
         click.echo(f"Successfully removed feed: {url}")
     else:
@@ -76,6 +157,7 @@ def remove(url):
 @click.argument("file_path", type=click.Path(exists=True))
 def import_from_file(file_path):
     """Import feeds from a JSON file"""
+    feed_manager = get_feed_manager()
     try:
         with open(file_path, "r") as f:
             data = json.load(f)
@@ -109,6 +191,19 @@ def import_from_file(file_path):
         click.echo(f"Error: Failed to import feeds - {str(e)}")
 
 
+@feed.command()
+@click.argument("url")
+@click.argument("category")
+def move(url, category):
+    """Move all entries of a feed to a category"""
+    feed_manager = get_feed_manager()
+    moved = feed_manager.move_feed_entries(url, category)
+    if moved is None:
+        click.echo(f"Failed to move entries of {url} to {category}")
+    else:
+        click.echo(f"Moved {moved} entries of {url} to {category}")
+
+
 @feed.command()
 @click.argument("days", type=int)
 def backdate(days):
@@ -117,6 +212,7 @@ def backdate(days):
     Args:
         days: Number of days to backdate
     """
+    feed_manager = get_feed_manager()
     if feed_manager.backdate_feeds(days):
         click.echo(f"Successfully backdated feeds by {days} days")
     else:
@@ -0,0 +1,18 @@
+import atexit
+from typing import Optional
+from core.feed_manager import FeedManager
+
+_feed_manager: Optional[FeedManager] = None
+
+
+def get_feed_manager() -> FeedManager:
+    """Get the FeedManager shared by all commands, opening it on first use.
+
+    Only a command that needs it opens the database, and it is closed when
+    the CLI exits so any queued writes are applied.
+    """
+    global _feed_manager
+    if _feed_manager is None:
+        _feed_manager = FeedManager()
+        atexit.register(_feed_manager.close)
+    return _feed_manager
@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least recently used item.
+
+    Safe to share between the UI thread and the fetch worker threads.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return default
+            return self._items[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Named LRU regions of query results that never outlive the data.
+
+    The owner invalidates the regions a mutation affects. Writes committed
+    by any other connection, in this process or another, are detected
+    through the database's data_version before each lookup and drop every
+    region listed in external, or those whose validator changed.
+    """
+
+    def __init__(
+        self,
+        data_version: Callable[[], int],
+        sizes: Dict[str, int],
+        external: Sequence[str] = (),
+        validators: Optional[Dict[str, Callable[[], Hashable]]] = None,
+    ):
+        """Create the regions.
+
+        Args:
+            data_version: Returns the calling thread's connection data_version
+            sizes: Maximum number of items per region name
+            external: Regions whose contents other connections can change
+            validators: For external regions that only depend on part of the
+                data, a function returning a value that changes whenever that
+                part does; they are kept across writes that leave it unchanged
+        """
+        self._data_version = data_version
+        self._regions = {name: LRUCache(size) for name, size in sizes.items()}
+        self._generations = {name: 0 for name in sizes}
+        self._external = tuple(external)
+        self._validators = validators or {}
+        self._validated: Dict[str, Hashable] = {}
+        self._lock = threading.Lock()
+        # data_version is per connection, and connections are per thread
+        self._seen = threading.local()
+
+    def get(self, region: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Get a cached value, calling load to fill it on a miss."""
+        self._check_version()
+        value = self._regions[region].get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        generation = self._generations[region]
+        value = load()
+        with self._lock:
+            # Do not cache a result that was invalidated while it was loading
+            if generation == self._generations[region]:
+                self._regions[region].put(key, value)
+        return value
+
+    def peek(self, region: str, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value without loading it on a miss."""
+        self._check_version()
+        return self._regions[region].get(key, default)
+
+    def put(self, region: str, key: Hashable, value: Any) -> None:
+        self._regions[region].put(key, value)
+
+    def invalidate(self, *regions: str) -> None:
+        """Drop the given regions, or all of them if none are given."""
+        with self._lock:
+            for region in regions or self._regions:
+                self._generations[region] += 1
+                self._regions[region].clear()
+
+    def _check_version(self) -> None:
+        version = self._data_version()
+        if getattr(self._seen, "version", None) != version:
+            # Also taken on a thread's first lookup, as the regions may have
+            # been filled from another connection at an unknown version
+            stale = [region for region in self._external if self._changed(region)]
+            if stale:
+                self.invalidate(*stale)
+            self._seen.version = version
+
+    def _changed(self, region: str) -> bool:
+        """Whether an external region's validator changed since last checked."""
+        validator = self._validators.get(region)
+        if validator is None:
+            return True
+        value = validator()
+        with self._lock:
+            changed = self._validated.get(region, _MISSING) != value
+            self._validated[region] = value
+        return changed
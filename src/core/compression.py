@@ -0,0 +1,36 @@
+import zlib
+from typing import Optional, Tuple, Union
+
+# Bodies shorter than this are stored as plain text; zlib's header and the
+# lack of repetition in short strings make compressing them a loss
+COMPRESS_THRESHOLD = 256
+COMPRESS_LEVEL = 6
+
+
+def pack_text(text: Optional[str]) -> Optional[Union[str, bytes]]:
+    """Compress a large text into a zlib BLOB, leaving small ones as they are."""
+    if not text or len(text) < COMPRESS_THRESHOLD:
+        return text
+    packed = zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+    return packed if len(packed) < len(text) else text
+
+
+def unpack_text(value: Optional[Union[str, bytes]]) -> Optional[str]:
+    """Reverse pack_text. Also registered as an SQL function on every connection."""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+def pack_bodies(
+    description: Optional[str], content: Optional[str]
+) -> Tuple[Optional[Union[str, bytes]], Optional[Union[str, bytes]]]:
+    """Pack an entry's description and content for storage.
+
+    Feeds without separate content repeat the description, so in that case
+    content is stored as NULL and read back as the description.
+    """
+    packed_description = pack_text(description)
+    if content == description:
+        return packed_description, None
+    return packed_description, pack_text(content)
@@ -1,77 +1,126 @@
+import json
 import sqlite3
 import os
-from datetime import datetime
+import threading
+from datetime import date, datetime, time
 import pytz
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterator, Optional, Any, Sequence, Tuple, Union
+from .compression import pack_bodies, unpack_text
+from .migrations import migrate
+from .parsing import published_timestamp, strip_html, summarize
+from .records import (
+    DigestEntry,
+    Entry,
+    EntrySummary,
+    Feed,
+    RetentionPolicy,
+    SearchResult,
+)
+
+
+def to_timestamp(value: Union[date, datetime], end_of_day: bool = False) -> int:
+    """Convert a date or datetime to a UTC epoch for published_ts comparisons.
+
+    Naive values are taken as local time, and plain dates as the start of the
+    day or, with end_of_day, its last second.
+    """
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.max if end_of_day else time.min)
+    return int(value.timestamp())
+
+
+# Columns in Entry._fields order; queries using this join feeds as f and
+# categories as c
+ENTRY_COLUMNS = """
+    e.id, e.feed_id, e.guid, e.title, e.link, e.description, e.content,
+    e.published, e.published_ts, e.category_id, e.is_read,
+    f.title AS feed_title, c.name AS category
+"""
+
+# The columns of EntrySummary, for lists that do not show the bodies
+SUMMARY_COLUMNS = """
+    e.id, e.feed_id, e.title, e.link, e.published, e.published_ts, e.is_read,
+    f.title AS feed_title, c.name AS category
+"""
+
+
+# Applied to every connection; WAL lets readers run while another process
+# writes. auto_vacuum only takes effect on new databases, compact() converts
+# existing ones.
+CONNECTION_PRAGMAS = (
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+)
 
 
 class Database:
-    def __init__(self):
-        self.db_path = os.path.join(
+    def __init__(self, db_path: Optional[str] = None):
+        """Open the database, creating or upgrading it as needed.
+
+        Args:
+            db_path: Database file to use instead of readless.db in the
+                project directory
+        """
+        self.db_path = db_path or os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "readless.db"
         )
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
         self._init_db()
 
     # Database initialization methods
     def _init_db(self) -> None:
-        """Initialize the database and create tables if they don't exist."""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        """Create the database or upgrade its schema to the current version."""
+        migrate(self._get_connection())
 
-            # Create categories table
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL
-                )
-            """
-            )
-
-            # Create feeds table
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS feeds (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT UNIQUE NOT NULL,
-                    title TEXT NOT NULL,
-                    last_updated TIMESTAMP,
-                    enabled BOOLEAN DEFAULT 1
-                )
-            """
-            )
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use.
 
-            # Create entries table
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS entries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    feed_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    link TEXT UNIQUE NOT NULL,
-                    description TEXT,
-                    content TEXT,
-                    published TEXT,
-                    category_id INTEGER DEFAULT 1,
-                    is_read BOOLEAN DEFAULT 0,
-                    FOREIGN KEY (feed_id) REFERENCES feeds (id),
-                    FOREIGN KEY (category_id) REFERENCES categories (id)
-                )
-            """
-            )
+        Connections are kept open for the lifetime of the Database so every
+        call reuses the same page cache instead of reconnecting.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._close_dead_connections()
+                self._connections[threading.get_ident()] = conn
+        return conn
 
-            # Insert default category if it doesn't exist
-            cursor.execute(
-                "INSERT OR IGNORE INTO categories (name) VALUES (?)", ("Uncategorized",)
-            )
+    def _connect(self) -> sqlite3.Connection:
+        """Open a tuned connection whose rows support access by column name."""
+        # Each connection is only used by the thread that opened it, but may be
+        # closed from another one by close()
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # Used by the full-text index to read compressed entry bodies and
+        # index their text without the markup
+        conn.create_function("unpack_text", 1, unpack_text, deterministic=True)
+        conn.create_function("strip_html", 1, strip_html, deterministic=True)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
 
-            conn.commit()
+    def _close_dead_connections(self) -> None:
+        """Close connections owned by threads that have exited."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with row factory set to dict."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = lambda c, r: dict(zip([col[0] for col in c.description], r))
-        return conn
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._connections_lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
     # Feed operations
     def add_feed(self, feed_data: Dict[str, Any]) -> bool:
@@ -95,43 +144,132 @@ class Database:
                 )
 
                 feed_id = cursor.lastrowid
-
-                # Get default category ID (Uncategorized)
-                cursor.execute("SELECT id FROM categories WHERE name = 'Uncategorized'")
-                default_category = cursor.fetchone()
-
-                # Insert entries
-                for entry in feed_data.get("entries", []):
-                    cursor.execute(
-                        """
-                        INSERT INTO entries 
-                        (feed_id, title, link, description, content, published, category_id)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            feed_id,
-                            entry["title"],
-                            entry["link"],
-                            entry.get("description", ""),
-                            entry.get("content", ""),
-                            entry.get("published", ""),
-                            default_category["id"],
-                        ),
-                    )
+                self._upsert_entries(cursor, feed_id, feed_data.get("entries", []))
 
                 conn.commit()
                 return True
         except sqlite3.Error:
             return False
 
-    def get_feeds(self) -> List[Dict[str, Any]]:
+    def upsert_entries(
+        self, feed_id: int, entries: List[Dict[str, Any]]
+    ) -> Optional[Tuple[int, int, int]]:
+        """Insert new entries of a feed and update the ones it already has.
+
+        Entries are matched on the feed's GUID, or on the link for entries
+        without one. Entries whose link already belongs to another entry are
+        skipped. All rows are written in a single transaction.
+
+        Args:
+            feed_id: The ID of the feed the entries belong to
+            entries: Entry dicts as produced by the feed parser
+
+        Returns:
+            Tuple of (inserted, updated, skipped) entry counts, or None on error
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                counts = self._upsert_entries(cursor, feed_id, entries)
+                conn.commit()
+                return counts
+        except sqlite3.Error:
+            return None
+
+    def _upsert_entries(
+        self, cursor: sqlite3.Cursor, feed_id: int, entries: List[Dict[str, Any]]
+    ) -> Tuple[int, int, int]:
+        """Upsert entries within the caller's transaction.
+
+        Links are unique across feeds, so an entry whose link another entry
+        already has is skipped rather than failing the whole batch. Any other
+        constraint violation is an error.
+
+        Returns:
+            Tuple of (inserted, updated, skipped) entry counts
+        """
+        if not entries:
+            return 0, 0, 0
+
+        rows = [(entry.get("guid") or entry["link"], entry) for entry in entries]
+        cursor.execute(
+            """
+            SELECT guid FROM entries
+            WHERE feed_id = ? AND guid IN (SELECT value FROM json_each(?))
+        """,
+            (feed_id, json.dumps([guid for guid, _ in rows])),
+        )
+        existing = {row["guid"] for row in cursor.fetchall()}
+        cursor.execute(
+            """
+            SELECT link, feed_id, guid FROM entries
+            WHERE link IN (SELECT value FROM json_each(?))
+        """,
+            (json.dumps([entry["link"] for _, entry in rows]),),
+        )
+        owners = {row["link"]: (row["feed_id"], row["guid"]) for row in cursor}
+
+        # Entries sharing a link within the batch collide just the same
+        accepted = []
+        for guid, entry in rows:
+            owner = owners.setdefault(entry["link"], (feed_id, guid))
+            if owner == (feed_id, guid):
+                accepted.append((guid, entry))
+        inserted = len({guid for guid, _ in accepted} - existing)
+
+        # Get default category ID (Uncategorized)
+        cursor.execute("SELECT id FROM categories WHERE name = 'Uncategorized'")
+        default_category = cursor.fetchone()
+
+        # Existing rows are only rewritten when the feed actually changed them
+        cursor.executemany(
+            """
+            INSERT INTO entries
+            (feed_id, guid, title, link, description, content, published,
+             published_ts, category_id, summary_text)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (feed_id, guid) DO UPDATE SET
+                title = excluded.title,
+                description = excluded.description,
+                content = excluded.content,
+                summary_text = excluded.summary_text,
+                published = excluded.published,
+                published_ts = excluded.published_ts
+            WHERE title IS NOT excluded.title
+                OR description IS NOT excluded.description
+                OR content IS NOT excluded.content
+                OR published IS NOT excluded.published
+        """,
+            [
+                (
+                    feed_id,
+                    guid,
+                    entry["title"],
+                    entry["link"],
+                    *pack_bodies(
+                        entry.get("description", ""), entry.get("content", "")
+                    ),
+                    entry.get("published", ""),
+                    published_timestamp(entry.get("published", "")),
+                    default_category["id"],
+                    summarize(entry.get("description", "")),
+                )
+                for guid, entry in accepted
+            ],
+        )
+        # rowcount leaves out the rows written by triggers
+        return inserted, cursor.rowcount - inserted, len(rows) - len(accepted)
+
+    def get_feeds(self) -> List[Feed]:
         """Get all feeds."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM feeds")
-            feeds = cursor.fetchall()
-            for feed in feeds:
-                feed["last_updated"] = datetime.fromisoformat(feed["last_updated"])
+            cursor.row_factory = None
+            cursor.execute(f"SELECT {', '.join(Feed._fields)} FROM feeds")
+            feeds = []
+            for feed in map(Feed._make, cursor.fetchall()):
+                last_updated = datetime.fromisoformat(feed.last_updated)
+                feeds.append(feed._replace(last_updated=last_updated))
             return feeds
 
     def update_feed(self, url: str, updates: Dict[str, Any]) -> bool:
@@ -152,6 +290,17 @@ class Database:
                 if "last_updated" in updates:
                     update_fields.append("last_updated = ?")
                     params.append(updates["last_updated"].isoformat())
+                for field in (
+                    "etag",
+                    "last_modified",
+                    "redirect_url",
+                    "next_poll",
+                    "poll_interval",
+                    "content_hash",
+                ):
+                    if field in updates:
+                        update_fields.append(f"{field} = ?")
+                        params.append(updates[field])
 
                 if update_fields:
                     params.append(url)
@@ -169,6 +318,11 @@ class Database:
         try:
             with self._get_connection() as conn:
                 cursor = conn.cursor()
+                # Entries reference the feed, so they have to go first
+                cursor.execute(
+                    "DELETE FROM entries WHERE feed_id = (SELECT id FROM feeds WHERE url = ?)",
+                    (url,),
+                )
                 cursor.execute("DELETE FROM feeds WHERE url = ?", (url,))
                 conn.commit()
                 return True
@@ -285,34 +439,143 @@ class Database:
             except sqlite3.Error:
                 return False
 
+    def set_entries_category(
+        self,
+        category: str,
+        entry_ids: Sequence[int] = (),
+        entry_links: Sequence[str] = (),
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Optional[int]:
+        """Move many entries to a category with one UPDATE in one transaction.
+
+        Args:
+            category: Name of the category to move the entries to
+            entry_ids: Ids of entries to move
+            entry_links: Links of entries to move
+            filters: Move every entry matching these _entry_filters
+                arguments instead of the listed ones
+
+        Returns:
+            Number of entries moved, or None if the category does not exist
+            or the update failed
+        """
+        if filters is not None:
+            selection, params = self._filtered_selection(filters)
+        else:
+            selection, params = self._entry_selection(entry_ids, entry_links)
+
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id FROM categories WHERE name = ?", (category,))
+                category_data = cursor.fetchone()
+                if not category_data:
+                    return None
+
+                cursor.execute(
+                    f"UPDATE entries SET category_id = ? WHERE {selection}",
+                    [category_data["id"]] + params,
+                )
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error:
+            return None
+
+    def apply_entry_changes(
+        self,
+        read_status: Dict[bool, Tuple[Sequence[int], Sequence[str]]],
+        categories: Dict[str, Tuple[Sequence[int], Sequence[str]]],
+    ) -> bool:
+        """Apply batches of read status and category changes in one transaction.
+
+        Args:
+            read_status: (entry ids, entry links) to mark, by read status
+            categories: (entry ids, entry links) to move, by category name;
+                changes to categories that no longer exist are dropped
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for is_read, (entry_ids, entry_links) in read_status.items():
+                    selection, params = self._entry_selection(entry_ids, entry_links)
+                    cursor.execute(
+                        f"UPDATE entries SET is_read = ? WHERE {selection}",
+                        [1 if is_read else 0] + params,
+                    )
+                for category, (entry_ids, entry_links) in categories.items():
+                    selection, params = self._entry_selection(entry_ids, entry_links)
+                    cursor.execute(
+                        f"""
+                        UPDATE entries
+                        SET category_id = (SELECT id FROM categories WHERE name = ?)
+                        WHERE EXISTS (SELECT 1 FROM categories WHERE name = ?)
+                        AND ({selection})
+                    """,
+                        [category, category] + params,
+                    )
+                conn.commit()
+                return True
+        except sqlite3.Error:
+            return False
+
+    def _filtered_selection(self, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Build a WHERE condition on entries matching _entry_filters arguments."""
+        where, params = self._entry_filters(**filters)
+        return (
+            f"""id IN (
+                SELECT e.id FROM entries e JOIN feeds f ON e.feed_id = f.id
+                WHERE {where}
+            )""",
+            params,
+        )
+
+    def _entry_selection(
+        self, entry_ids: Sequence[int], entry_links: Sequence[str]
+    ) -> Tuple[str, List[str]]:
+        """Build a WHERE condition matching entries by id or link.
+
+        The lists are passed as JSON arrays, so any number of entries binds
+        as two parameters.
+        """
+        return (
+            """(id IN (SELECT value FROM json_each(?))
+                OR link IN (SELECT value FROM json_each(?)))""",
+            [json.dumps(list(entry_ids)), json.dumps(list(entry_links))],
+        )
+
     def get_entries_by_date_range(
-        self, start_date: datetime, end_date: datetime
-    ) -> List[Dict]:
+        self, start_date: Union[date, datetime], end_date: Union[date, datetime]
+    ) -> List[Entry]:
         """Get entries between specified dates.
 
         Args:
-            start_date: Start date of the range
-            end_date: End date of the range
+            start_date: Start of the range; a date starts at local midnight
+            end_date: End of the range; a date includes the whole day
 
         Returns:
             List of entries with title, link, description, and category
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             cursor.execute(
-                """
-                SELECT e.title, e.link, e.description, c.name as category
+                f"""
+                SELECT {ENTRY_COLUMNS}
                 FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
                 JOIN categories c ON e.category_id = c.id
-                WHERE e.published BETWEEN ? AND ?
-                ORDER BY e.published DESC
+                WHERE e.published_ts BETWEEN ? AND ?
+                ORDER BY e.published_ts DESC
                 """,
-                (start_date, end_date),
+                (to_timestamp(start_date), to_timestamp(end_date, end_of_day=True)),
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return list(map(Entry._make, cursor.fetchall()))
 
     def set_entry_read_status(
-        self, entry_links: str | List[str], is_read: bool
+        self, entry_links: Union[str, List[str]], is_read: bool
     ) -> bool:
         """Set read status for one or multiple feed entries."""
         try:
@@ -350,26 +613,664 @@ class Database:
                     """
                     DELETE FROM entries
                     WHERE feed_id = (SELECT id FROM feeds WHERE url = ?)
-                    AND published > ?
+                    AND published_ts > ?
                     """,
-                    (feed_url, date.isoformat()),
+                    (feed_url, to_timestamp(date)),
                 )
                 conn.commit()
                 return True
         except sqlite3.Error:
             return False
 
-    def get_feed_entries(self, feed_url: str) -> List[Dict[str, Any]]:
+    def get_feed_entries(self, feed_url: str) -> List[Entry]:
         """Get all entries for a specific feed."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             cursor.execute(
-                """
-                SELECT e.*
+                f"""
+                SELECT {ENTRY_COLUMNS}
                 FROM entries e
                 JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON e.category_id = c.id
                 WHERE f.url = ? AND f.enabled = 1
             """,
                 (feed_url,),
             )
-            return cursor.fetchall()
+            return list(map(Entry._make, cursor.fetchall()))
+
+    def list_entries(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        unread_only: bool = False,
+    ) -> List[EntrySummary]:
+        """Get entry summaries of enabled feeds with their feed title and category in one query.
+
+        Args:
+            feed_url: Only include entries of this feed
+            category: Only include entries in this category
+            unread_only: Only include entries that have not been read
+
+        Returns:
+            List of entry summaries, newest first
+        """
+        where, params = self._entry_filters(feed_url, category, unread_only)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                f"""
+                SELECT {SUMMARY_COLUMNS}
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON e.category_id = c.id
+                WHERE {where}
+                ORDER BY e.published_ts DESC, e.id DESC
+            """,
+                params,
+            )
+            return list(map(EntrySummary._make, cursor.fetchall()))
+
+    def get_entries(self, entry_ids: List[int]) -> List[Entry]:
+        """Get full entries, including their bodies, by id in one query."""
+        if not entry_ids:
+            return []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                f"""
+                SELECT {ENTRY_COLUMNS}
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON e.category_id = c.id
+                WHERE e.id IN ({", ".join("?" * len(entry_ids))})
+            """,
+                entry_ids,
+            )
+            return list(map(Entry._make, cursor.fetchall()))
+
+    def iter_entries(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order: str = "desc",
+        page_size: int = 500,
+        after: Optional[Tuple[Optional[int], int]] = None,
+        summaries: bool = False,
+    ) -> Iterator[Union[Entry, EntrySummary]]:
+        """Stream entries page by page using keyset pagination.
+
+        Each page continues from the (published_ts, id) of the last row of the
+        previous one instead of using OFFSET, so every page costs the same
+        index seek however deep into the history it is.
+
+        Args:
+            filters: Keyword arguments for _entry_filters, e.g. feed_url,
+                category, unread_only, start, end or enabled_only
+            order: "desc" for newest first, "asc" for oldest first
+            page_size: Number of rows fetched per query
+            after: Resume after the entry with this (published_ts, id), as
+                taken from the last entry a previous iteration returned
+            summaries: Yield EntrySummary records without the bodies
+
+        Yields:
+            Entry or EntrySummary records in the requested order
+        """
+        while True:
+            page = self.get_entry_page(filters, order, page_size, after, summaries)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = (page[-1].published_ts, page[-1].id)
+
+    def iter_digest_entries(
+        self,
+        start: Union[date, datetime],
+        end: Union[date, datetime],
+        page_size: int = 500,
+    ) -> Iterator[DigestEntry]:
+        """Stream the entries published in a date range for a digest.
+
+        Entries of every feed, enabled or not, are ordered by category name
+        and newest first within a category, so callers can write one category
+        at a time. Rows are fetched page_size at a time.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                """
+                SELECT c.name AS category, f.title AS feed_title, e.title, e.link,
+                       e.published_ts, e.summary_text
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON e.category_id = c.id
+                WHERE e.published_ts BETWEEN ? AND ?
+                ORDER BY c.name, e.published_ts DESC, e.id DESC
+            """,
+                (to_timestamp(start), to_timestamp(end, end_of_day=True)),
+            )
+            for rows in iter(lambda: cursor.fetchmany(page_size), []):
+                yield from map(DigestEntry._make, rows)
+
+    def get_entry_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order: str = "desc",
+        page_size: int = 500,
+        after: Optional[Tuple[Optional[int], int]] = None,
+        summaries: bool = False,
+    ) -> List[Union[Entry, EntrySummary]]:
+        """Get the page of entries that follows a keyset cursor.
+
+        Takes the same arguments as iter_entries. A page shorter than
+        page_size is the last one.
+        """
+        columns, record = (
+            (SUMMARY_COLUMNS, EntrySummary) if summaries else (ENTRY_COLUMNS, Entry)
+        )
+        where, params = self._entry_filters(**(filters or {}))
+        descending = order == "desc"
+        direction = "DESC" if descending else "ASC"
+        comparison = "<" if descending else ">"
+
+        # SQLite sorts undated entries after dated ones when descending and
+        # before them when ascending, so they are paged through separately
+        phases = ["dated", "undated"] if descending else ["undated", "dated"]
+        if after is not None:
+            # Skip the phase the cursor has already moved past
+            after_phase = "undated" if after[0] is None else "dated"
+            phases = phases[phases.index(after_phase) :]
+
+        page = []
+        for phase in phases:
+            key = after if after is not None and phase == after_phase else None
+            if phase == "dated":
+                condition = "e.published_ts IS NOT NULL"
+                if key:
+                    condition += f" AND (e.published_ts, e.id) {comparison} (?, ?)"
+                order_by = f"e.published_ts {direction}, e.id {direction}"
+                key_params = list(key) if key else []
+            else:
+                condition = "e.published_ts IS NULL"
+                if key:
+                    condition += f" AND e.id {comparison} ?"
+                order_by = f"e.id {direction}"
+                key_params = [key[1]] if key else []
+
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(
+                    f"""
+                    SELECT {columns}
+                    FROM entries e
+                    JOIN feeds f ON e.feed_id = f.id
+                    JOIN categories c ON e.category_id = c.id
+                    WHERE {where} AND {condition}
+                    ORDER BY {order_by}
+                    LIMIT ?
+                """,
+                    params + key_params + [page_size - len(page)],
+                )
+                page.extend(map(record._make, cursor.fetchall()))
+            if len(page) == page_size:
+                break
+        return page
+
+    def _entry_filters(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        unread_only: bool = False,
+        start: Optional[Union[date, datetime]] = None,
+        end: Optional[Union[date, datetime]] = None,
+        enabled_only: bool = True,
+    ) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause for entry queries joining feeds as f and categories as c.
+
+        Feed and category are matched through their ids so the planner can
+        use the entries indexes directly.
+        """
+        conditions = ["f.enabled = 1"] if enabled_only else ["1"]
+        params = []
+        if feed_url is not None:
+            conditions.append("e.feed_id = (SELECT id FROM feeds WHERE url = ?)")
+            params.append(feed_url)
+        if category is not None:
+            conditions.append(
+                "e.category_id = (SELECT id FROM categories WHERE name = ?)"
+            )
+            params.append(category)
+        if unread_only:
+            conditions.append("e.is_read = 0")
+        if start is not None:
+            conditions.append("e.published_ts >= ?")
+            params.append(to_timestamp(start))
+        if end is not None:
+            conditions.append("e.published_ts <= ?")
+            params.append(to_timestamp(end, end_of_day=True))
+        return " AND ".join(conditions), params
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        highlight: Tuple[str, str] = ("[", "]"),
+    ) -> Optional[List[SearchResult]]:
+        """Full-text search over entry titles, descriptions and content.
+
+        The query uses FTS5 syntax (phrases, prefix*, AND/OR/NOT); if it does
+        not parse, its words are searched for as plain terms instead.
+
+        Args:
+            query: The search query
+            limit: Maximum number of results
+            highlight: Markers placed around matched terms in the snippets
+
+        Returns:
+            Best matching entries first, or None on database errors
+        """
+        try:
+            return self._search(query, limit, highlight)
+        except sqlite3.OperationalError:
+            terms = " ".join(
+                '"' + term.replace('"', '""') + '"' for term in query.split()
+            )
+            try:
+                return self._search(terms, limit, highlight) if terms else []
+            except sqlite3.Error:
+                return None
+        except sqlite3.Error:
+            return None
+
+    def _search(
+        self, query: str, limit: int, highlight: Tuple[str, str]
+    ) -> List[SearchResult]:
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            # Rank and limit inside the index before joining, so only the
+            # returned rows are looked up in the other tables
+            cursor.execute(
+                f"""
+                SELECT {SUMMARY_COLUMNS}, m.snippet, m.rank
+                FROM (
+                    SELECT rowid, rank,
+                           snippet(entries_fts, -1, ?, ?, '...', 16) AS snippet
+                    FROM entries_fts
+                    WHERE entries_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                ) m
+                JOIN entries e ON e.id = m.rowid
+                JOIN feeds f ON e.feed_id = f.id
+                JOIN categories c ON e.category_id = c.id
+                ORDER BY m.rank
+            """,
+                (*highlight, query, limit),
+            )
+            return list(map(SearchResult._make, cursor.fetchall()))
+
+    # Bulk operations
+    def mark_entries_read(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        until: Optional[Union[date, datetime]] = None,
+        is_read: bool = True,
+    ) -> Optional[int]:
+        """Mark every entry of a feed, a category and/or up to a date in one UPDATE.
+
+        Args:
+            feed_url: Only mark entries of this feed
+            category: Only mark entries in this category
+            until: Only mark entries published up to this date; a date
+                includes the whole day
+            is_read: Whether to mark the entries read or unread
+
+        Returns:
+            Number of entries whose status changed, or None on error
+        """
+        selection, params = self._filtered_selection(
+            {
+                "feed_url": feed_url,
+                "category": category,
+                "end": until,
+                "enabled_only": False,
+            }
+        )
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"UPDATE entries SET is_read = ? WHERE is_read != ? AND {selection}",
+                    [int(is_read), int(is_read)] + params,
+                )
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error:
+            return None
+
+    def backdate_feeds(self, date: datetime) -> bool:
+        """Reset every feed to a last update date and remove entries published after it.
+
+        The HTTP validators and body hashes are cleared as well, so the next
+        fetch downloads and parses every feed in full and brings the removed
+        entries back.
+
+        Args:
+            date: The new last update date of all feeds
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    UPDATE feeds
+                    SET last_updated = ?, etag = NULL, last_modified = NULL,
+                        content_hash = NULL
+                """,
+                    (date.isoformat(),),
+                )
+                cursor.execute(
+                    "DELETE FROM entries WHERE published_ts > ?", (to_timestamp(date),)
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error:
+            return False
+
+    def move_feed_entries(self, feed_url: str, category: str) -> Optional[int]:
+        """Move all entries of a feed to a category in one UPDATE.
+
+        Returns:
+            Number of entries moved, or None if the category does not exist
+            or the update failed
+        """
+        return self.set_entries_category(
+            category, filters={"feed_url": feed_url, "enabled_only": False}
+        )
+
+    def get_unread_counts(self) -> Dict[str, Dict[str, int]]:
+        """Get the number of unread entries per feed and per category.
+
+        Reads the trigger-maintained unread_counts table, so the cost does
+        not depend on the number of entries.
+
+        Returns:
+            Dict with "feeds" mapping feed URLs and "categories" mapping
+            category names to their unread counts; zero counts are omitted
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT f.url AS name, SUM(u.unread) AS unread
+                FROM unread_counts u JOIN feeds f ON u.feed_id = f.id
+                GROUP BY u.feed_id
+            """
+            )
+            feeds = {row["name"]: row["unread"] for row in cursor.fetchall()}
+            cursor.execute(
+                """
+                SELECT c.name AS name, SUM(u.unread) AS unread
+                FROM unread_counts u JOIN categories c ON u.category_id = c.id
+                GROUP BY u.category_id
+            """
+            )
+            categories = {row["name"]: row["unread"] for row in cursor.fetchall()}
+            return {"feeds": feeds, "categories": categories}
+
+    def data_version(self) -> int:
+        """Get a number that changes whenever another connection commits a write.
+
+        Reads shared memory only, so it is cheap enough to check before every
+        cache lookup.
+        """
+        return self._get_connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def body_version(self) -> int:
+        """Get a number that changes whenever an entry's description or content does."""
+        return (
+            self._get_connection()
+            .execute("SELECT version FROM body_version")
+            .fetchone()[0]
+        )
+
+    def get_category_ids(self) -> Dict[str, int]:
+        """Get the ids of all categories by name."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM categories ORDER BY id")
+            return {row["name"]: row["id"] for row in cursor.fetchall()}
+
+    # Retention and maintenance
+    def set_retention_policy(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        keep_days: Optional[int] = None,
+        keep_read_days: Optional[int] = None,
+        content_days: Optional[int] = None,
+    ) -> bool:
+        """Set how long the entries of a feed or category are kept.
+
+        A feed's policy takes precedence over the policy of the category its
+        entries are in.
+
+        Args:
+            feed_url: The feed the policy applies to
+            category: The category the policy applies to, if no feed is given
+            keep_days: Delete entries published more than this many days ago
+            keep_read_days: Delete read entries published more than this many
+                days ago
+            content_days: Drop the content, but keep the rest of the entry,
+                this many days after publication; entries whose content is
+                their description keep its plain-text summary instead
+
+        Returns:
+            bool: True if successful, False if the feed or category does not exist
+        """
+        if (feed_url is None) == (category is None):
+            return False
+
+        column, table, key = (
+            ("feed_id", "feeds", "url")
+            if feed_url
+            else ("category_id", "categories", "name")
+        )
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT id FROM {table} WHERE {key} = ?", (feed_url or category,)
+                )
+                target = cursor.fetchone()
+                if not target:
+                    return False
+                cursor.execute(
+                    f"DELETE FROM retention_policies WHERE {column} = ?",
+                    (target["id"],),
+                )
+                cursor.execute(
+                    f"""
+                    INSERT INTO retention_policies
+                    ({column}, keep_days, keep_read_days, content_days)
+                    VALUES (?, ?, ?, ?)
+                """,
+                    (target["id"], keep_days, keep_read_days, content_days),
+                )
+                conn.commit()
+                return True
+        except sqlite3.Error:
+            return False
+
+    def remove_retention_policy(
+        self, feed_url: Optional[str] = None, category: Optional[str] = None
+    ) -> bool:
+        """Remove the retention policy of a feed or category, keeping its entries forever."""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    DELETE FROM retention_policies
+                    WHERE feed_id = (SELECT id FROM feeds WHERE url = ?)
+                    OR category_id = (SELECT id FROM categories WHERE name = ?)
+                """,
+                    (feed_url, category),
+                )
+                conn.commit()
+                return cursor.rowcount > 0
+        except sqlite3.Error:
+            return False
+
+    def get_retention_policies(self) -> List[RetentionPolicy]:
+        """Get all retention policies, feed policies first."""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(
+                """
+                SELECT f.url, c.name, p.keep_days, p.keep_read_days, p.content_days
+                FROM retention_policies p
+                LEFT JOIN feeds f ON p.feed_id = f.id
+                LEFT JOIN categories c ON p.category_id = c.id
+                ORDER BY p.feed_id IS NULL, f.url, c.name
+            """
+            )
+            return list(map(RetentionPolicy._make, cursor.fetchall()))
+
+    def apply_retention(self, now: Optional[float] = None) -> Optional[Dict[str, int]]:
+        """Delete and strip entries according to the retention policies.
+
+        Entries without a publish date are never pruned.
+
+        Args:
+            now: POSIX time the ages are measured from, defaults to the current time
+
+        Returns:
+            Dict with the number of entries deleted and stripped of their
+            content, or None on database errors
+        """
+        now = datetime.now().timestamp() if now is None else now
+        deleted = stripped = 0
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM retention_policies")
+                for policy in cursor.fetchall():
+                    # Entries follow their feed's policy, or their category's
+                    # if the feed has none
+                    if policy["feed_id"] is not None:
+                        scope, target = "feed_id = ?", policy["feed_id"]
+                    else:
+                        scope = """category_id = ? AND feed_id NOT IN (
+                            SELECT feed_id FROM retention_policies
+                            WHERE feed_id IS NOT NULL
+                        )"""
+                        target = policy["category_id"]
+
+                    if policy["keep_days"] is not None:
+                        cursor.execute(
+                            f"DELETE FROM entries WHERE {scope} AND published_ts < ?",
+                            (target, now - policy["keep_days"] * 86400),
+                        )
+                        deleted += cursor.rowcount
+                    if policy["keep_read_days"] is not None:
+                        cursor.execute(
+                            f"""
+                            DELETE FROM entries
+                            WHERE {scope} AND is_read = 1 AND published_ts < ?
+                        """,
+                            (target, now - policy["keep_read_days"] * 86400),
+                        )
+                        deleted += cursor.rowcount
+                    if policy["content_days"] is not None:
+                        # A NULL content is the description stored once, so
+                        # for those the description gives way to the summary.
+                        # Stripped entries are left with an empty content.
+                        cursor.execute(
+                            f"""
+                            UPDATE entries
+                            SET description = CASE WHEN content IS NULL
+                                    THEN summary_text ELSE description END,
+                                content = ''
+                            WHERE {scope} AND published_ts < ? AND (
+                                content != ''
+                                OR content IS NULL
+                                AND description IS NOT summary_text
+                            )
+                        """,
+                            (target, now - policy["content_days"] * 86400),
+                        )
+                        stripped += cursor.rowcount
+                conn.commit()
+                return {"deleted": deleted, "stripped": stripped}
+        except sqlite3.Error:
+            return None
+
+    def compact(self) -> Optional[Dict[str, int]]:
+        """Return free pages to the file system and tidy up indexes.
+
+        The first call on a database created without incremental auto-vacuum
+        converts it with a full VACUUM; later calls only release free pages.
+
+        Returns:
+            Dict with the file size in bytes before and after, or None on
+            database errors
+        """
+        try:
+            conn = self._get_connection()
+            before = self._file_size(conn)
+            cursor = conn.cursor()
+            # Merge the full-text index segments left behind by many small writes
+            cursor.execute("INSERT INTO entries_fts (entries_fts) VALUES ('optimize')")
+            conn.commit()
+            if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+            else:
+                # Frees one page per step; executescript runs it to completion
+                cursor.executescript("PRAGMA incremental_vacuum")
+            cursor.execute("PRAGMA optimize")
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return {"size_before": before, "size_after": self._file_size(conn)}
+        except sqlite3.Error:
+            return None
+
+    def _file_size(self, conn: sqlite3.Connection) -> int:
+        """Size of the database in bytes, excluding its write-ahead log."""
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def get_publish_times(self, feed_url: str, limit: int = 20) -> List[float]:
+        """Get publish times of a feed's most recent entries.
+
+        Args:
+            feed_url: The URL of the feed
+            limit: Maximum number of entries to look at
+
+        Returns:
+            List of POSIX timestamps, skipping entries without a parsable date
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT e.published_ts
+                FROM entries e
+                JOIN feeds f ON e.feed_id = f.id
+                WHERE f.url = ? AND e.published_ts IS NOT NULL
+                ORDER BY e.published_ts DESC
+                LIMIT ?
+            """,
+                (feed_url, limit),
+            )
+            return [row["published_ts"] for row in cursor.fetchall()]
@@ -0,0 +1,92 @@
+import json
+from datetime import date, datetime, timezone
+from html import escape
+from itertools import groupby
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, Iterator
+from .records import DigestEntry
+
+
+def markdown_digest(
+    entries: Iterable[DigestEntry], start: date, end: date
+) -> Iterator[str]:
+    """Render a digest as markdown, one chunk at a time.
+
+    Args:
+        entries: Entries ordered by category, as from iter_digest_entries
+        start: First day of the digest
+        end: Last day of the digest
+
+    Yields:
+        Pieces of the document, to be joined or written out in order
+    """
+    yield f"# RSS Digest from {start:%Y-%m-%d} to {end:%Y-%m-%d}\n\n"
+    for category, group in groupby(entries, key=attrgetter("category")):
+        yield f"## {category}\n\n"
+        for entry in group:
+            yield f"### [{entry.title}]({entry.link})\n"
+            if entry.summary_text:
+                yield f"{entry.summary_text}\n"
+        yield "\n"
+
+
+def html_digest(
+    entries: Iterable[DigestEntry], start: date, end: date
+) -> Iterator[str]:
+    """Render a digest as a standalone HTML page, one chunk at a time."""
+    title = escape(f"RSS Digest from {start:%Y-%m-%d} to {end:%Y-%m-%d}")
+    yield (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{title}</title>\n</head>\n<body>\n<h1>{title}</h1>\n"
+    )
+    for category, group in groupby(entries, key=attrgetter("category")):
+        yield f"<h2>{escape(category)}</h2>\n"
+        for entry in group:
+            yield (
+                f'<h3><a href="{escape(entry.link)}">{escape(entry.title)}</a></h3>\n'
+                f"<p><small>{escape(entry.feed_title)}</small></p>\n"
+            )
+            if entry.summary_text:
+                yield f"<p>{escape(entry.summary_text)}</p>\n"
+    yield "</body>\n</html>\n"
+
+
+def json_digest(
+    entries: Iterable[DigestEntry], start: date, end: date
+) -> Iterator[str]:
+    """Render a digest as a JSON document, one chunk at a time.
+
+    The document is {"start", "end", "categories": [{"name", "entries"}]},
+    written entry by entry so it is never held in memory as a whole.
+    """
+    yield f'{{"start": "{start:%Y-%m-%d}", "end": "{end:%Y-%m-%d}", "categories": ['
+    for index, (category, group) in enumerate(
+        groupby(entries, key=attrgetter("category"))
+    ):
+        yield f'{", " if index else ""}{{"name": {json.dumps(category)}, "entries": ['
+        for position, entry in enumerate(group):
+            published = (
+                datetime.fromtimestamp(entry.published_ts, timezone.utc).isoformat()
+                if entry.published_ts is not None
+                else None
+            )
+            item = {
+                "title": entry.title,
+                "link": entry.link,
+                "feed": entry.feed_title,
+                "published": published,
+                "summary": entry.summary_text or "",
+            }
+            yield f'{", " if position else ""}{json.dumps(item)}'
+        yield "]}"
+    yield "]}\n"
+
+
+# Renderers by the file extension of the format they produce
+DIGEST_FORMATS: Dict[
+    str, Callable[[Iterable[DigestEntry], date, date], Iterator[str]]
+] = {
+    "md": markdown_digest,
+    "html": html_digest,
+    "json": json_digest,
+}
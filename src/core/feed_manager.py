@@ -1,21 +1,100 @@
-import feedparser
+from collections import defaultdict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
+import hashlib
+import multiprocessing
 import pytz
-from typing import List, Dict
+import requests
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from .database import Database
+from .parsing import (
+    ENTRY_FIELDS,
+    parse_document,
+    parse_entry_tuples,
+    parse_new_entries,
+)
+from .cache import QueryCache
+from .records import (
+    DigestEntry,
+    Entry,
+    EntrySummary,
+    Feed,
+    RetentionPolicy,
+    SearchResult,
+)
+from .transport import Transport
+from .writer import WriteBehindQueue
+
+
+# Cache regions and their sizes: the feed map and category ids are cached
+# whole, entry summary pages and lists, and decompressed bodies by entry id
+FEEDS = "feeds"
+CATEGORIES = "categories"
+ENTRIES = "entries"
+BODIES = "bodies"
+CACHE_SIZES = {FEEDS: 1, CATEGORIES: 1, ENTRIES: 64, BODIES: 128}
+
+
+def _parse_context() -> multiprocessing.context.BaseContext:
+    """Start parse workers from a fresh process instead of forking this one.
+
+    By the time the pool starts, the download and writer threads are
+    running, and forking a process with threads can deadlock the child.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Only import the parser in the server the workers are forked from
+        context.set_forkserver_preload([parse_entry_tuples.__module__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _entry_dicts(packed: Optional[List[Tuple[str, ...]]]) -> Optional[List[Dict]]:
+    """Turn the result of parse_entry_tuples back into entry dicts."""
+    if packed is None:
+        return None
+    return [dict(zip(ENTRY_FIELDS, entry)) for entry in packed]
 
 
 class FeedManager:
-    def __init__(self):
-        self.db = Database()
-        self.feeds = {feed["url"]: feed for feed in self.get_feeds()}
+    def __init__(self, db_path: Optional[str] = None):
+        self.db = Database(db_path)
+        self.transport = Transport()
+        # Every mutation below invalidates the regions it affects, and writes
+        # from other connections drop the rest. Bodies are only dropped when
+        # such a write edited articles, so the writer marking entries read
+        # does not discard them.
+        self.cache = QueryCache(
+            self.db.data_version,
+            CACHE_SIZES,
+            external=(FEEDS, CATEGORIES, ENTRIES, BODIES),
+            validators={BODIES: self.db.body_version},
+        )
+        # Queued read status and category changes; the entry queries below
+        # flush it first so they never return state older than the UI's
+        self.writer = WriteBehindQueue(
+            self.db, on_write=lambda: self.cache.invalidate(ENTRIES)
+        )
+
+    def close(self) -> None:
+        """Write queued changes and release network and database connections."""
+        self.writer.close()
+        self.transport.close()
+        self.db.close()
 
     # Feed-related operations
     def add_feed(self, url: str) -> bool:
         """Add a new RSS feed without fetching initial content."""
         try:
             # Validate feed and get title
-            feed_data = feedparser.parse(url)
+            response = self.transport.fetch(url)
+            feed_data = parse_document(response.content, response.headers, response.url)
             if feed_data.get("bozo", 1) == 1:
                 return False
 
@@ -28,29 +107,54 @@ class FeedManager:
                 "enabled": True,
                 "entries": [],
             }
-            return self.db.add_feed(feed)
+            added = self.db.add_feed(feed)
+            self.cache.invalidate(FEEDS)
+            return added
         except Exception:
             return False
 
     def remove_feed(self, url: str) -> None:
         """Remove a feed and its articles."""
         self.db.remove_feed(url)
+        self.cache.invalidate(FEEDS, ENTRIES)
 
-    def get_feeds(self) -> List[Dict]:
+    @property
+    def feeds(self) -> Dict[str, Feed]:
+        """All feeds by URL, from the cache."""
+        return self.cache.get(
+            FEEDS, None, lambda: {feed.url: feed for feed in self.db.get_feeds()}
+        )
+
+    def get_feeds(self) -> List[Feed]:
         """Get list of all feeds."""
-        return self.db.get_feeds()
+        return list(self.feeds.values())
+
+    def reload_feeds(self) -> None:
+        """Re-read the feed list from the database on next use."""
+        self.cache.invalidate(FEEDS)
 
     def toggle_feed_status(self, url: str) -> bool:
         """Toggle feed enabled/disabled status."""
-        feeds = self.db.get_feeds()
-        feed = next((f for f in feeds if f["url"] == url), None)
+        feed = self.feeds.get(url)
         if not feed:
             return False
-        return self.db.update_feed(url, {"enabled": not feed["enabled"]})
+        updated = self.db.update_feed(url, {"enabled": not feed["enabled"]})
+        self.cache.invalidate(FEEDS, ENTRIES)
+        return updated
 
     def update_feed_title(self, url: str, new_title: str) -> bool:
         """Update the title of a feed."""
-        return self.db.update_feed(url, {"title": new_title})
+        updated = self.db.update_feed(url, {"title": new_title})
+        self.cache.invalidate(FEEDS, ENTRIES)
+        return updated
+
+    def update_poll_schedule(self, url: str, next_poll: int, interval: int) -> bool:
+        """Persist when a feed is next due to be polled."""
+        updated = self.db.update_feed(
+            url, {"next_poll": next_poll, "poll_interval": interval}
+        )
+        self.cache.invalidate(FEEDS)
+        return updated
 
     def refresh_feed(self, url: str) -> tuple[bool, int]:
         """Refresh articles for a specific feed, skipping old entries."""
@@ -63,88 +167,439 @@ class FeedManager:
             success = self.add_feed(url)
             return success, 0 if not success else len(self.feeds[url]["entries"])
 
-        # Parse new feed data
-        feed_data = feedparser.parse(url)
-        if feed_data.get("bozo", 1) == 1:
+        feed = self.feeds[url]
+        fetched = self._fetch_feed(feed)
+        if fetched["status"] == "failed":
             return False, 0
+        if fetched["status"] in ("not_modified", "unchanged"):
+            return True, 0
+        counts = self._store_fetch(feed, fetched)
+        return counts is not None, counts[0] if counts else 0
+
+    def refresh_all(
+        self,
+        max_workers: int = 8,
+        per_host_limit: int = 2,
+        callback: Optional[Callable[[Dict], None]] = None,
+        urls: Optional[List[str]] = None,
+        processes: int = 0,
+    ) -> List[Dict]:
+        """Refresh all enabled feeds concurrently.
+
+        Args:
+            max_workers: Size of the download/parse thread pool
+            per_host_limit: Maximum number of concurrent requests to one host
+            callback: Called with each feed's result as soon as it completes
+            urls: Only refresh these feeds instead of every enabled feed
+            processes: Parse downloaded feeds in this many worker processes
+                instead of the download threads; 0 disables the process pool
+
+        Returns:
+            List of result dicts with url, title, status, success, count
+            (entries inserted), updated, skipped (entries whose link another
+            entry already has) and error
+        """
+        results = []
+        for result in self.iter_refresh(max_workers, per_host_limit, urls, processes):
+            if callback:
+                callback(result)
+            results.append(result)
+        return results
+
+    def iter_refresh(
+        self,
+        max_workers: int = 8,
+        per_host_limit: int = 2,
+        urls: Optional[List[str]] = None,
+        processes: int = 0,
+    ) -> Iterator[Dict]:
+        """Refresh all enabled feeds concurrently, yielding results as they complete.
+
+        Downloads run on a bounded thread pool, which also parses them unless
+        a process pool is used. In that case the downloaded bodies are handed
+        to the pool from here, so parsing is not limited by the number of
+        download threads. Database writes stay on the calling thread.
+        """
+        wanted = set(urls) if urls is not None else None
+        pending = defaultdict(deque)
+        for url, feed in self.feeds.items():
+            if feed["enabled"] and (wanted is None or url in wanted):
+                pending[urlparse(url).netloc].append(feed)
+
+        # feedparser is pure Python, so parsing only scales past one core
+        # when it runs in separate processes
+        parse_pool = (
+            ProcessPoolExecutor(max_workers=processes, mp_context=_parse_context())
+            if processes
+            else None
+        )
+        fetch = self._download_feed if parse_pool else self._fetch_feed
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Download and parse futures, each with the feed's host, the
+                # feed, and for parses the download it belongs to
+                in_flight = {}
+
+                def submit_next(host):
+                    if pending[host]:
+                        feed = pending[host].popleft()
+                        in_flight[executor.submit(fetch, feed)] = (host, feed, None)
+
+                # Hosts only get a new request once one of their own finishes,
+                # so a slow host never holds more than per_host_limit workers.
+                for host in list(pending):
+                    for _ in range(per_host_limit):
+                        submit_next(host)
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        host, feed, downloaded = in_flight.pop(future)
+                        try:
+                            if downloaded is None:
+                                submit_next(host)
+                                fetched = future.result()
+                                if fetched["status"] == "downloaded":
+                                    parse = parse_pool.submit(
+                                        parse_entry_tuples, *fetched.pop("parse_args")
+                                    )
+                                    in_flight[parse] = (host, feed, fetched)
+                                    continue
+                            else:
+                                fetched = self._parsed_fetch(
+                                    downloaded, _entry_dicts(future.result())
+                                )
+                            result = self._refresh_result(feed, fetched)
+                        except Exception as e:
+                            # Also covers feeds removed while they were fetched
+                            result = self._refresh_result(
+                                feed, {"status": "failed", "error": str(e)}
+                            )
+                        yield result
+        finally:
+            if parse_pool:
+                parse_pool.shutdown()
+
+    def _refresh_result(self, feed: Dict, fetched: Dict) -> Dict:
+        """Store a completed fetch and describe its outcome."""
+        result = {
+            "url": feed["url"],
+            "title": feed["title"],
+            "status": "failed",
+            "success": False,
+            "count": 0,
+            "updated": 0,
+            "skipped": 0,
+            "error": None,
+        }
+        result["status"] = fetched["status"]
+        result["error"] = fetched["error"]
+        if fetched["status"] in ("not_modified", "unchanged"):
+            result["success"] = True
+        elif fetched["status"] == "ok":
+            counts = self._store_fetch(feed, fetched)
+            if counts is not None:
+                result["success"] = True
+                result["count"], result["updated"], result["skipped"] = counts
+            else:
+                result["status"] = "failed"
+                result["error"] = "could not store the entries"
+        return result
+
+    def _fetch_feed(self, feed: Dict) -> Dict:
+        """Download and parse a feed, keeping entries newer than its last update.
+
+        Safe to call from worker threads as it does not touch the database.
+
+        Returns:
+            Dict with the fetch status ("ok", "not_modified", "unchanged" or
+            "failed"), the new entries and the validators to persist for the
+            next request
+        """
+        fetched = self._download_feed(feed)
+        if fetched["status"] != "downloaded":
+            return fetched
+        return self._parsed_fetch(
+            fetched, parse_new_entries(*fetched.pop("parse_args"))
+        )
+
+    def _download_feed(self, feed: Dict) -> Dict:
+        """Download a feed without parsing it.
+
+        The stored ETag and Last-Modified validators are sent with the request
+        so unchanged feeds come back as a bodiless 304, and bodies identical to
+        the last one fetched are skipped before parsing. Safe to call from
+        worker threads as it does not touch the database.
+
+        Returns:
+            Dict as returned by _fetch_feed, except that a body to parse has
+            the status "downloaded" and parse_args, the arguments for
+            parse_new_entries or parse_entry_tuples
+        """
+        fetched = {"status": "failed", "entries": [], "validators": {}, "error": None}
+        try:
+            response = self.transport.fetch(
+                feed.get("redirect_url") or feed["url"],
+                etag=feed.get("etag"),
+                modified=feed.get("last_modified"),
+            )
+        except requests.RequestException as e:
+            fetched["error"] = str(e)
+            return fetched
+        if response.status == 304:
+            fetched["status"] = "not_modified"
+            return fetched
+
+        # Many servers ignore conditional requests and resend the same body
+        content_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if content_hash == feed.get("content_hash"):
+            fetched["status"] = "unchanged"
+            return fetched
+
+        fetched["status"] = "downloaded"
+        fetched["parse_args"] = (
+            response.content,
+            response.headers,
+            response.url,
+            feed["last_updated"],
+        )
+        fetched["validators"] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "content_hash": content_hash,
+        }
+        if response.permanent_redirect:
+            fetched["validators"]["redirect_url"] = response.permanent_redirect
+        return fetched
+
+    def _parsed_fetch(self, fetched: Dict, new_entries: Optional[List[Dict]]) -> Dict:
+        """Complete a downloaded fetch with its parsed entries, or None if unparseable."""
+        if new_entries is None:
+            # Keep the validators of the last good response
+            return {**fetched, "status": "failed", "validators": {}}
+        return {**fetched, "status": "ok", "entries": new_entries}
+
+    def _store_fetch(self, feed: Dict, fetched: Dict) -> Optional[Tuple[int, int, int]]:
+        """Store new entries and the validators of the latest response.
 
-        # Prepare new entries
-        new_entries = []
-        for entry in feed_data.entries:
-            published = entry.get("published", "")
-            if published:
-                try:
-                    entry_date = datetime.strptime(
-                        published, "%a, %d %b %Y %H:%M:%S %z"
-                    )
-                    if entry_date > last_updated:
-                        article = {
-                            "title": entry.get("title", "No title"),
-                            "link": entry.get("link", ""),
-                            "description": entry.get("description", ""),
-                            "published": published,
-                            "content": (
-                                entry.get("content", [{"value": ""}])[0]["value"]
-                                if "content" in entry
-                                else entry.get("description", "")
-                            ),
-                        }
-                        new_entries.append(article)
-                except ValueError:
-                    continue
-
-        # Update feed with new entries
-        if new_entries:
-            feed = self.feeds[url].copy()
-            feed["entries"] = new_entries
-            feed["last_updated"] = datetime.now(pytz.UTC)
-            return self.db.update_feed(url, feed), len(new_entries)
-        return True, 0
+        Args:
+            feed: The feed as it was when the fetch started; it may have
+                been removed since, in which case storing fails
+
+        Returns:
+            Tuple of (inserted, updated, skipped) entry counts, or None on error
+        """
+        updates = dict(fetched["validators"])
+        counts = (0, 0, 0)
+        if fetched["entries"]:
+            counts = self.db.upsert_entries(feed["id"], fetched["entries"])
+            if counts is None:
+                return None
+            self.cache.invalidate(ENTRIES)
+            if counts[1]:
+                # Some stored articles were edited by their feed
+                self.cache.invalidate(BODIES)
+            updates["last_updated"] = datetime.now(pytz.UTC)
+        stored = self.db.update_feed(feed["url"], updates)
+        self.cache.invalidate(FEEDS)
+        return counts if stored else None
 
     # Category-related operations
     def get_categories(self) -> List[str]:
         """Get list of all categories."""
-        return self.db.get_categories()
+        return list(self.get_category_ids())
+
+    def get_category_ids(self) -> Dict[str, int]:
+        """Get the ids of all categories by name, from the cache."""
+        return self.cache.get(CATEGORIES, None, self.db.get_category_ids)
 
     def add_category(self, category: str) -> bool:
         """Add a new category."""
-        return self.db.add_category(category)
+        added = self.db.add_category(category)
+        self.cache.invalidate(CATEGORIES)
+        return added
 
     def remove_category(self, category: str) -> bool:
         """Remove a category and move its entries to Uncategorized."""
-        return self.db.remove_category(category)
+        self.writer.flush()
+        removed = self.db.remove_category(category)
+        self.cache.invalidate(CATEGORIES, ENTRIES)
+        return removed
 
     def rename_category(self, old_name: str, new_name: str) -> bool:
         """Rename a category."""
-        return self.db.rename_category(old_name, new_name)
+        self.writer.flush()
+        renamed = self.db.rename_category(old_name, new_name)
+        self.cache.invalidate(CATEGORIES, ENTRIES)
+        return renamed
 
     # Entry-related operations
-    def get_entries(self, feed_url: str) -> List[Dict]:
+    def get_entries(self, feed_url: str) -> List[Entry]:
         """Get entries for a specific feed."""
         return self.db.get_feed_entries(feed_url)
 
-    def get_all_entries(self) -> List[Dict]:
-        """Get all entries from enabled feeds."""
-        all_entries = []
-        for url, feed in self.feeds.items():
-            if feed["enabled"]:
-                entries = self.get_entries(url)
-                for entry in entries:
-                    entry["feed_title"] = feed["title"]
-                all_entries.extend(entries)
-        return all_entries
+    def get_all_entries(self) -> List[EntrySummary]:
+        """Get summaries of all entries from enabled feeds."""
+        return self.list_entries()
+
+    def list_entries(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        unread_only: bool = False,
+    ) -> List[EntrySummary]:
+        """Get entry summaries of enabled feeds, optionally filtered by feed, category or unread."""
+        self.writer.flush()
+        return list(
+            self.cache.get(
+                ENTRIES,
+                ("list", feed_url, category, unread_only),
+                lambda: self.db.list_entries(feed_url, category, unread_only),
+            )
+        )
+
+    def iter_entries(
+        self,
+        filters: Optional[Dict] = None,
+        order: str = "desc",
+        page_size: int = 500,
+        after: Optional[Tuple[Optional[int], int]] = None,
+        summaries: bool = False,
+    ) -> Iterator[Union[Entry, EntrySummary]]:
+        """Stream entries in constant memory using keyset pagination.
+
+        Args:
+            filters: Any of feed_url, category, unread_only, start, end and
+                enabled_only
+            order: "desc" for newest first, "asc" for oldest first
+            page_size: Number of rows fetched per query
+            after: (published_ts, id) of the entry to resume after
+            summaries: Yield EntrySummary records without the bodies, for lists;
+                the first page is served from the cache
+        """
+        self.writer.flush()
+        if not summaries:
+            return self.db.iter_entries(filters, order, page_size, after)
+        return self._iter_cached_summaries(filters, order, page_size, after)
+
+    def _iter_cached_summaries(
+        self,
+        filters: Optional[Dict],
+        order: str,
+        page_size: int,
+        after: Optional[Tuple[Optional[int], int]],
+    ) -> Iterator[EntrySummary]:
+        key = ("page", tuple(sorted((filters or {}).items())), order, page_size, after)
+        # Only the first page, which is what lists show straight away, is
+        # cached; the rest stream in constant memory
+        page = self.cache.get(
+            ENTRIES,
+            key,
+            lambda: self.db.get_entry_page(
+                filters, order, page_size, after, summaries=True
+            ),
+        )
+        while True:
+            yield from page
+            if len(page) < page_size:
+                return
+            after = (page[-1].published_ts, page[-1].id)
+            page = self.db.get_entry_page(
+                filters, order, page_size, after, summaries=True
+            )
+
+    def get_entry_body(self, entry_id: int) -> Optional[str]:
+        """Get the decompressed HTML content of an entry for display.
+
+        Returns:
+            The content, or None if the entry does not exist
+        """
+        body = self.cache.peek(BODIES, entry_id)
+        if body is None:
+            self.prefetch_entry_bodies([entry_id])
+            body = self.cache.peek(BODIES, entry_id)
+        return body
+
+    def prefetch_entry_bodies(self, entry_ids: List[int]) -> None:
+        """Load the bodies of entries likely to be opened next into the cache."""
+        missing = [
+            entry_id
+            for entry_id in entry_ids
+            if self.cache.peek(BODIES, entry_id) is None
+        ]
+        for entry in self.db.get_entries(missing):
+            self.cache.put(BODIES, entry.id, entry.content_text)
+
+    def search(
+        self, query: str, limit: int = 50, highlight: Tuple[str, str] = ("[", "]")
+    ) -> List[SearchResult]:
+        """Search entries by title, description and content.
+
+        Args:
+            query: Words to search for, or an FTS5 query
+            limit: Maximum number of results
+            highlight: Markers placed around matched terms in the snippets
+
+        Returns:
+            Matching entries ranked by BM25, each with a snippet
+        """
+        self.writer.flush()
+        return self.db.search(query, limit, highlight) or []
 
     def set_entry_category(self, entry_link: str, category: str) -> bool:
         """Set category for a feed entry."""
-        return self.db.set_entry_category(entry_link, category)
+        self.writer.flush()
+        updated = self.db.set_entry_category(entry_link, category)
+        self.cache.invalidate(ENTRIES)
+        return updated
+
+    def set_entries_category(
+        self,
+        links_or_ids: Sequence[Union[int, str]],
+        category: str,
+        filters: Optional[Dict] = None,
+    ) -> Optional[int]:
+        """Move many entries to a category in a single transaction.
+
+        Args:
+            links_or_ids: Entry ids and/or links of the entries to move
+            category: Name of the category to move them to
+            filters: Move every entry matching these iter_entries filters
+                instead; links_or_ids is then ignored
+
+        Returns:
+            Number of entries moved, or None if the category does not exist
+        """
+        entry_ids = [item for item in links_or_ids if isinstance(item, int)]
+        entry_links = [item for item in links_or_ids if isinstance(item, str)]
+        self.writer.flush()
+        moved = self.db.set_entries_category(category, entry_ids, entry_links, filters)
+        self.cache.invalidate(ENTRIES)
+        return moved
+
+    def queue_entries_category(
+        self, links_or_ids: Sequence[Union[int, str]], category: str
+    ) -> None:
+        """Move entries to a category in the background, without waiting for the write."""
+        self.writer.set_category(links_or_ids, category)
+
+    def queue_read_status(
+        self, links_or_ids: Union[int, str, Sequence[Union[int, str]]], is_read: bool
+    ) -> None:
+        """Mark entries read or unread in the background, without waiting for the write."""
+        self.writer.set_read_status(links_or_ids, is_read)
 
     def get_entry_category(self, entry_link: str) -> str:
         """Get category for a feed entry."""
         return self.db.get_entry_category(entry_link)
 
+    def get_publish_times(self, feed_url: str, limit: int = 20) -> List[float]:
+        """Get publish times of a feed's most recent entries as POSIX timestamps."""
+        return self.db.get_publish_times(feed_url, limit)
+
     def get_entries_by_date_range(
         self, start_date: datetime, end_date: datetime
-    ) -> List[Dict]:
+    ) -> List[Entry]:
         """Get entries between specified dates.
 
         Args:
@@ -154,13 +609,83 @@ class FeedManager:
         Returns:
             List of entries with title, link, description, and category
         """
+        self.writer.flush()
         return self.db.get_entries_by_date_range(start_date, end_date)
 
+    def iter_digest_entries(
+        self, start_date: datetime, end_date: datetime
+    ) -> Iterator[DigestEntry]:
+        """Stream the entries of a digest, grouped by category.
+
+        Args:
+            start_date: First day of the digest
+            end_date: Last day of the digest, included
+        """
+        self.writer.flush()
+        return self.db.iter_digest_entries(start_date, end_date)
+
     def set_entry_read_status(
-        self, entry_links: str | List[str], is_read: bool
+        self, entry_links: Union[str, List[str]], is_read: bool
     ) -> bool:
         """Set read status for one or multiple feed entries."""
-        return self.db.set_entry_read_status(entry_links, is_read)
+        self.writer.flush()
+        updated = self.db.set_entry_read_status(entry_links, is_read)
+        self.cache.invalidate(ENTRIES)
+        return updated
+
+    def get_unread_counts(self) -> Dict[str, Dict[str, int]]:
+        """Get unread entry counts by feed URL ("feeds") and category name ("categories")."""
+        self.writer.flush()
+        return self.db.get_unread_counts()
+
+    # Retention and maintenance
+    def set_retention_policy(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        keep_days: Optional[int] = None,
+        keep_read_days: Optional[int] = None,
+        content_days: Optional[int] = None,
+    ) -> bool:
+        """Set how long the entries of a feed or category are kept.
+
+        Args:
+            feed_url: The feed the policy applies to
+            category: The category the policy applies to, if no feed is given
+            keep_days: Delete entries older than this many days
+            keep_read_days: Delete read entries older than this many days
+            content_days: Drop the content of entries older than this many days
+        """
+        return self.db.set_retention_policy(
+            feed_url, category, keep_days, keep_read_days, content_days
+        )
+
+    def remove_retention_policy(
+        self, feed_url: Optional[str] = None, category: Optional[str] = None
+    ) -> bool:
+        """Remove the retention policy of a feed or category."""
+        return self.db.remove_retention_policy(feed_url, category)
+
+    def get_retention_policies(self) -> List[RetentionPolicy]:
+        """Get all retention policies."""
+        return self.db.get_retention_policies()
+
+    def compact(self) -> Optional[Dict[str, int]]:
+        """Apply the retention policies, then shrink the database file.
+
+        Returns:
+            Dict with the number of entries deleted and stripped of their
+            content and the file size before and after, or None on failure
+        """
+        self.writer.flush()
+        pruned = self.db.apply_retention()
+        if pruned is None:
+            return None
+        self.cache.invalidate(ENTRIES, BODIES)
+        vacuumed = self.db.compact()
+        if vacuumed is None:
+            return None
+        return {**pruned, **vacuumed}
 
     def backdate_feeds(self, days: int) -> bool:
         """Backdate all feeds' last_updated field by specified number of days and remove entries after the new date.
@@ -171,23 +696,39 @@ class FeedManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            # Calculate new date
-            new_date = datetime.now(pytz.UTC) - timedelta(days=days)
-
-            # Get all feeds
-            feeds = self.get_feeds()
-            if not feeds:
-                return False
+        if not self.get_feeds():
+            return False
+        new_date = datetime.now(pytz.UTC) - timedelta(days=days)
+        self.writer.flush()
+        if not self.db.backdate_feeds(new_date):
+            return False
+        self.cache.invalidate()
+        return True
+
+    def mark_entries_read(
+        self,
+        feed_url: Optional[str] = None,
+        category: Optional[str] = None,
+        until: Optional[datetime] = None,
+        is_read: bool = True,
+    ) -> Optional[int]:
+        """Mark all entries of a feed, a category and/or up to a date read or unread.
 
-            # Update each feed
-            for feed in feeds:
-                # Update last_updated field
-                self.db.update_feed(feed["url"], {"last_updated": new_date})
+        Returns:
+            Number of entries changed, or None on error
+        """
+        self.writer.flush()
+        changed = self.db.mark_entries_read(feed_url, category, until, is_read)
+        self.cache.invalidate(ENTRIES)
+        return changed
 
-                # Remove entries after new date
-                self.db.remove_entries_after_date(feed["url"], new_date)
+    def move_feed_entries(self, feed_url: str, category: str) -> Optional[int]:
+        """Move all entries of a feed to a category.
 
-            return True
-        except Exception:
-            return False
+        Returns:
+            Number of entries moved, or None if the category does not exist
+        """
+        self.writer.flush()
+        moved = self.db.move_feed_entries(feed_url, category)
+        self.cache.invalidate(ENTRIES)
+        return moved
@@ -0,0 +1,649 @@
+import sqlite3
+from typing import Callable, Dict, List
+from .compression import pack_bodies, unpack_text
+from .parsing import published_timestamp, summarize
+
+BATCH_SIZE = 1000
+
+
+def add_missing_columns(
+    cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]
+) -> None:
+    """Add columns that are missing from a table created by an older version."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row["name"] for row in cursor.fetchall()}
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def commit_batch(cursor: sqlite3.Cursor) -> None:
+    """Commit a long migration's progress and continue in a new transaction.
+
+    Keeps the WAL from growing to the size of the database and lets an
+    interrupted migration resume instead of starting over. Only for
+    migrations written to pick up where they stopped, as another process
+    may run the same migration while the lock is released.
+    """
+    cursor.connection.commit()
+    cursor.execute("BEGIN IMMEDIATE")
+
+
+def index_entries(cursor: sqlite3.Cursor) -> None:
+    """Add the entries missing from the end of the full-text index, in batches.
+
+    Resumes after the highest id indexed, which is read again for every
+    batch in case another process indexed some in between.
+    """
+    while True:
+        # entries_fts_docsize has a row for every indexed entry
+        cursor.execute(
+            "SELECT COALESCE(MAX(id), 0) AS last_id FROM entries_fts_docsize"
+        )
+        last_id = cursor.fetchone()["last_id"]
+        cursor.execute(
+            "SELECT id FROM entries WHERE id > ? ORDER BY id LIMIT 1 OFFSET ?",
+            (last_id, BATCH_SIZE - 1),
+        )
+        row = cursor.fetchone()
+        batch_end = row["id"] if row else None
+        cursor.execute(
+            """
+            INSERT INTO entries_fts (rowid, title, description, content)
+            SELECT id, title, description, content FROM entries_text
+            WHERE id > ? AND id <= COALESCE(?, id)
+        """,
+            (last_id, batch_end),
+        )
+        commit_batch(cursor)
+        if batch_end is None:
+            break
+
+
+def initial_schema(cursor: sqlite3.Cursor) -> None:
+    """Create the tables, or bring a database from before versioning up to date."""
+    # Create categories table
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        )
+    """
+    )
+
+    # Create feeds table
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS feeds (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            last_updated TIMESTAMP,
+            enabled BOOLEAN DEFAULT 1,
+            etag TEXT,
+            last_modified TEXT,
+            redirect_url TEXT,
+            next_poll INTEGER,
+            poll_interval INTEGER,
+            content_hash TEXT
+        )
+    """
+    )
+
+    # HTTP validators, polling schedule and body hash were added after the
+    # first release
+    add_missing_columns(
+        cursor,
+        "feeds",
+        {
+            "etag": "TEXT",
+            "last_modified": "TEXT",
+            "redirect_url": "TEXT",
+            "next_poll": "INTEGER",
+            "poll_interval": "INTEGER",
+            "content_hash": "TEXT",
+        },
+    )
+
+    # Create entries table
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feed_id INTEGER NOT NULL,
+            guid TEXT,
+            title TEXT NOT NULL,
+            link TEXT UNIQUE NOT NULL,
+            description TEXT,
+            content TEXT,
+            published TEXT,
+            category_id INTEGER DEFAULT 1,
+            is_read BOOLEAN DEFAULT 0,
+            FOREIGN KEY (feed_id) REFERENCES feeds (id),
+            FOREIGN KEY (category_id) REFERENCES categories (id)
+        )
+    """
+    )
+
+    # Entries are keyed on their feed's GUID, falling back to the link
+    add_missing_columns(cursor, "entries", {"guid": "TEXT"})
+    cursor.execute("UPDATE entries SET guid = link WHERE guid IS NULL")
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_feed_guid
+        ON entries (feed_id, guid)
+    """
+    )
+
+    # Insert default category if it doesn't exist
+    cursor.execute(
+        "INSERT OR IGNORE INTO categories (name) VALUES (?)", ("Uncategorized",)
+    )
+
+
+def entry_indexes(cursor: sqlite3.Cursor) -> None:
+    """Index the columns entry listings filter, join and sort on."""
+    # Per-feed listings, sorted by date
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_entries_feed_published
+        ON entries (feed_id, published)
+    """
+    )
+    # Category listings and unread filters
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_entries_category_read
+        ON entries (category_id, is_read)
+    """
+    )
+    # Date range queries across all feeds
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_entries_published
+        ON entries (published)
+    """
+    )
+    cursor.execute("ANALYZE")
+
+
+def entry_timestamps(cursor: sqlite3.Cursor) -> None:
+    """Store publish dates as sortable UTC epochs and index them."""
+    add_missing_columns(cursor, "entries", {"published_ts": "INTEGER"})
+
+    # Backfill in batches so the raw strings are never all in memory at once
+    last_id = 0
+    while True:
+        cursor.execute(
+            """
+            SELECT id, published FROM entries
+            WHERE id > ? AND published_ts IS NULL
+            ORDER BY id LIMIT ?
+        """,
+            (last_id, BATCH_SIZE),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = [(published_timestamp(row["published"]), row["id"]) for row in rows]
+        cursor.executemany("UPDATE entries SET published_ts = ? WHERE id = ?", updates)
+        last_id = rows[-1]["id"]
+
+    # The text column does not sort chronologically, so its indexes are useless
+    cursor.execute("DROP INDEX IF EXISTS idx_entries_feed_published")
+    cursor.execute("DROP INDEX IF EXISTS idx_entries_published")
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_entries_feed_published_ts
+        ON entries (feed_id, published_ts)
+    """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_entries_published_ts
+        ON entries (published_ts)
+    """
+    )
+    cursor.execute("ANALYZE")
+
+
+def category_listing_index(cursor: sqlite3.Cursor) -> None:
+    """Let per-category listings page through entries in date order."""
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_entries_category_published_ts
+        ON entries (category_id, published_ts)
+    """
+    )
+
+
+def full_text_search(cursor: sqlite3.Cursor) -> None:
+    """Index entry text with FTS5, kept in sync with the entries table by triggers."""
+    # External content: the index stores only tokens and reads the text
+    # itself back from entries for snippets
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            title, description, content,
+            content='entries', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """
+    )
+    # Titles weigh most in the ranking, then descriptions
+    cursor.execute(
+        "INSERT INTO entries_fts (entries_fts, rank) VALUES ('rank', 'bm25(10.0, 3.0, 1.0)')"
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, title, description, content)
+            VALUES (new.id, new.title, new.description, new.content);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, title, description, content)
+            VALUES ('delete', old.id, old.title, old.description, old.content);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_update
+        AFTER UPDATE OF title, description, content ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, title, description, content)
+            VALUES ('delete', old.id, old.title, old.description, old.content);
+            INSERT INTO entries_fts (rowid, title, description, content)
+            VALUES (new.id, new.title, new.description, new.content);
+        END
+    """
+    )
+    # Index the entries that already exist
+    cursor.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+
+
+def retention_policies(cursor: sqlite3.Cursor) -> None:
+    """Add per-feed and per-category retention policies and clear out orphans."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS retention_policies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feed_id INTEGER UNIQUE REFERENCES feeds (id) ON DELETE CASCADE,
+            category_id INTEGER UNIQUE REFERENCES categories (id) ON DELETE CASCADE,
+            keep_days INTEGER,
+            keep_read_days INTEGER,
+            content_days INTEGER,
+            CHECK ((feed_id IS NULL) != (category_id IS NULL))
+        )
+    """
+    )
+
+    # Foreign keys were never enforced, so removed feeds left their entries
+    # behind and removed categories could leave dangling category ids
+    cursor.execute("DELETE FROM entries WHERE feed_id NOT IN (SELECT id FROM feeds)")
+    cursor.execute(
+        """
+        UPDATE entries
+        SET category_id = (SELECT id FROM categories WHERE name = 'Uncategorized')
+        WHERE category_id NOT IN (SELECT id FROM categories)
+    """
+    )
+
+
+def compressed_bodies(cursor: sqlite3.Cursor) -> None:
+    """Store large descriptions and contents as zlib BLOBs, without duplicates.
+
+    The full-text index reads its text through the entries_text view, which
+    decompresses with the unpack_text SQL function every connection registers.
+
+    The rows and the new index are written in committed batches. An
+    interrupted run, or one running alongside another process, resumes
+    where the last batch stopped: packed rows are recognised by their
+    BLOBs, and each indexing batch continues after the highest id indexed.
+    """
+    # The old index is dropped so rewriting the rows does not go through its
+    # triggers. The new one is kept when resuming.
+    cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'entries_fts'")
+    index = cursor.fetchone()
+    if index is None or "entries_text" not in index["sql"]:
+        for trigger in (
+            "entries_fts_insert",
+            "entries_fts_delete",
+            "entries_fts_update",
+        ):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP TABLE IF EXISTS entries_fts")
+
+    # Packing a text again leaves it unchanged, so only rows already holding
+    # a BLOB need to be skipped
+    last_id = 0
+    while True:
+        cursor.execute(
+            """
+            SELECT id, description, content FROM entries
+            WHERE id > ?
+            AND typeof(description) != 'blob' AND typeof(content) != 'blob'
+            ORDER BY id LIMIT ?
+        """,
+            (last_id, BATCH_SIZE),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = [
+            (*pack_bodies(row["description"], row["content"]), row["id"])
+            for row in rows
+        ]
+        cursor.executemany(
+            "UPDATE entries SET description = ?, content = ? WHERE id = ?", updates
+        )
+        last_id = rows[-1]["id"]
+        commit_batch(cursor)
+
+    cursor.execute(
+        """
+        CREATE VIEW IF NOT EXISTS entries_text AS
+        SELECT id, title,
+               unpack_text(description) AS description,
+               unpack_text(content) AS content
+        FROM entries
+    """
+    )
+    cursor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            title, description, content,
+            content='entries_text', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """
+    )
+    cursor.execute(
+        "INSERT INTO entries_fts (entries_fts, rank) VALUES ('rank', 'bm25(10.0, 3.0, 1.0)')"
+    )
+    commit_batch(cursor)
+
+    index_entries(cursor)
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, title, description, content)
+            VALUES (new.id, new.title, unpack_text(new.description),
+                    unpack_text(new.content));
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, title, description, content)
+            VALUES ('delete', old.id, old.title, unpack_text(old.description),
+                    unpack_text(old.content));
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_update
+        AFTER UPDATE OF title, description, content ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, title, description, content)
+            VALUES ('delete', old.id, old.title, unpack_text(old.description),
+                    unpack_text(old.content));
+            INSERT INTO entries_fts (rowid, title, description, content)
+            VALUES (new.id, new.title, unpack_text(new.description),
+                    unpack_text(new.content));
+        END
+    """
+    )
+
+
+def unread_counts(cursor: sqlite3.Cursor) -> None:
+    """Keep unread counts per feed and category up to date with triggers.
+
+    Only pairs with unread entries have a row, so reading all counts costs
+    O(feeds x categories in use) rather than a scan of the entries.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS unread_counts (
+            feed_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            unread INTEGER NOT NULL,
+            PRIMARY KEY (feed_id, category_id)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute("DELETE FROM unread_counts")
+    cursor.execute(
+        """
+        INSERT INTO unread_counts (feed_id, category_id, unread)
+        SELECT feed_id, category_id, COUNT(*) FROM entries
+        WHERE is_read = 0
+        GROUP BY feed_id, category_id
+    """
+    )
+
+    count_new = """
+        INSERT INTO unread_counts (feed_id, category_id, unread)
+        SELECT new.feed_id, new.category_id, 1 WHERE new.is_read = 0
+        ON CONFLICT (feed_id, category_id) DO UPDATE SET unread = unread + 1;
+    """
+    uncount_old = """
+        UPDATE unread_counts SET unread = unread - 1
+        WHERE old.is_read = 0
+        AND feed_id = old.feed_id AND category_id = old.category_id;
+        DELETE FROM unread_counts
+        WHERE feed_id = old.feed_id AND category_id = old.category_id
+        AND unread <= 0;
+    """
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS unread_counts_insert
+        AFTER INSERT ON entries WHEN new.is_read = 0 BEGIN
+            {count_new}
+        END
+    """
+    )
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS unread_counts_delete
+        AFTER DELETE ON entries WHEN old.is_read = 0 BEGIN
+            {uncount_old}
+        END
+    """
+    )
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS unread_counts_update
+        AFTER UPDATE OF is_read, category_id, feed_id ON entries
+        WHEN (old.is_read = 0 OR new.is_read = 0)
+        AND (old.is_read IS NOT new.is_read
+             OR old.category_id IS NOT new.category_id
+             OR old.feed_id IS NOT new.feed_id)
+        BEGIN
+            {uncount_old}
+            {count_new}
+        END
+    """
+    )
+
+
+def summary_texts(cursor: sqlite3.Cursor) -> None:
+    """Store a plain-text summary of each description for digests.
+
+    Backfilled in committed batches; an interrupted run resumes with the rows
+    that have no summary yet.
+    """
+    add_missing_columns(cursor, "entries", {"summary_text": "TEXT"})
+    commit_batch(cursor)
+
+    last_id = 0
+    while True:
+        cursor.execute(
+            """
+            SELECT id, description FROM entries
+            WHERE id > ? AND summary_text IS NULL ORDER BY id LIMIT ?
+        """,
+            (last_id, BATCH_SIZE),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        updates = [
+            (summarize(unpack_text(row["description"])), row["id"]) for row in rows
+        ]
+        cursor.executemany("UPDATE entries SET summary_text = ? WHERE id = ?", updates)
+        last_id = rows[-1]["id"]
+        commit_batch(cursor)
+
+
+def body_versions(cursor: sqlite3.Cursor) -> None:
+    """Count the changes to entry descriptions and contents.
+
+    Caches of decompressed bodies compare the count to tell another
+    process editing articles apart from its far more frequent other writes.
+    """
+    cursor.execute("CREATE TABLE IF NOT EXISTS body_version (version INTEGER NOT NULL)")
+    cursor.execute(
+        """
+        INSERT INTO body_version (version)
+        SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM body_version)
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS body_version_update
+        AFTER UPDATE OF description, content ON entries
+        WHEN old.description IS NOT new.description
+            OR old.content IS NOT new.content
+        BEGIN
+            UPDATE body_version SET version = version + 1;
+        END
+    """
+    )
+
+
+def plain_text_search(cursor: sqlite3.Cursor) -> None:
+    """Index the text of entry bodies instead of their HTML.
+
+    Markup no longer matches searches for words like "div" or "href", and
+    snippets show text without tags. The strip_html SQL function removes
+    it. Like compressed_bodies, the index is rebuilt in committed batches
+    and an interrupted run resumes where it stopped.
+    """
+    cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'entries_text'")
+    if "strip_html" not in cursor.fetchone()["sql"]:
+        for trigger in (
+            "entries_fts_insert",
+            "entries_fts_delete",
+            "entries_fts_update",
+        ):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP VIEW entries_text")
+        cursor.execute(
+            """
+            CREATE VIEW entries_text AS
+            SELECT id, title,
+                   strip_html(unpack_text(description)) AS description,
+                   strip_html(unpack_text(content)) AS content
+            FROM entries
+        """
+        )
+        cursor.execute("INSERT INTO entries_fts (entries_fts) VALUES ('delete-all')")
+        commit_batch(cursor)
+
+    index_entries(cursor)
+
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts (rowid, title, description, content)
+            VALUES (new.id, new.title, strip_html(unpack_text(new.description)),
+                    strip_html(unpack_text(new.content)));
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, title, description, content)
+            VALUES ('delete', old.id, old.title,
+                    strip_html(unpack_text(old.description)),
+                    strip_html(unpack_text(old.content)));
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS entries_fts_update
+        AFTER UPDATE OF title, description, content ON entries BEGIN
+            INSERT INTO entries_fts (entries_fts, rowid, title, description, content)
+            VALUES ('delete', old.id, old.title,
+                    strip_html(unpack_text(old.description)),
+                    strip_html(unpack_text(old.content)));
+            INSERT INTO entries_fts (rowid, title, description, content)
+            VALUES (new.id, new.title, strip_html(unpack_text(new.description)),
+                    strip_html(unpack_text(new.content)));
+        END
+    """
+    )
+
+
+# Applied in order; a database's PRAGMA user_version is the number of
+# migrations it has already run. Only ever append to this list.
+MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    initial_schema,
+    entry_indexes,
+    entry_timestamps,
+    category_listing_index,
+    full_text_search,
+    retention_policies,
+    compressed_bodies,
+    unread_counts,
+    summary_texts,
+    body_versions,
+    plain_text_search,
+]
+
+
+def schema_version(cursor: sqlite3.Cursor) -> int:
+    """Get the number of migrations the database has run."""
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()["user_version"]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Run the migrations a database has not seen yet, each in its own transaction.
+
+    Each transaction takes the write lock before reading the version, so
+    processes opening the same database at once wait for each other instead
+    of repeating a migration another one already ran.
+
+    Returns:
+        The schema version the database is at afterwards
+    """
+    cursor = conn.cursor()
+    version = schema_version(cursor)
+
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Checked again before every migration, as those that commit in
+            # batches let other processes in between them
+            if schema_version(cursor) < number:
+                migration(cursor)
+                # Never go back, should another process have moved past this
+                # migration while its batches were being committed
+                if schema_version(cursor) < number:
+                    cursor.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+    return version
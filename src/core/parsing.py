@@ -0,0 +1,288 @@
+import feedparser
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+ENTRY_TAGS = ("item", "entry")
+ENTRY_FIELDS = ("guid", "title", "link", "description", "published", "content")
+CHUNK_SIZE = 64 * 1024
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+# Maximum length of the plain-text summary stored with each entry
+SUMMARY_LENGTH = 500
+
+
+class NotDateOrdered(Exception):
+    """Raised when a feed cannot be cut off at the first old entry."""
+
+
+class NoEntries(Exception):
+    """Raised when a well-formed document has no items or entries, e.g. an error page."""
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    """Parse an RFC 822 or ISO 8601 feed date into an aware datetime.
+
+    Returns None if the value is empty or not a recognised date.
+    """
+    if not value:
+        return None
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            date = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+
+def published_timestamp(published: str) -> Optional[int]:
+    """Convert a feed's published string to a UTC epoch, or None if it has no date."""
+    published_date = parse_date(published)
+    return int(published_date.timestamp()) if published_date else None
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text of an HTML fragment, skipping scripts and styles."""
+
+    SKIPPED_TAGS = ("script", "style")
+    BREAKING_TAGS = ("br", "p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in self.BREAKING_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self.skipping:
+            self.skipping -= 1
+        elif tag in self.BREAKING_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def strip_html(html: Optional[str]) -> Optional[str]:
+    """Get the text of an HTML fragment, without its markup, scripts and styles.
+
+    Also registered as an SQL function on every connection, for the
+    full-text index.
+    """
+    if not html or ("<" not in html and "&" not in html):
+        return html
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return "".join(extractor.parts)
+
+
+def summarize(html: Optional[str], length: int = SUMMARY_LENGTH) -> str:
+    """Strip the markup from an entry description and shorten it.
+
+    Whitespace is collapsed, and text longer than length is cut at the last
+    word boundary and ends with an ellipsis.
+    """
+    if not html:
+        return ""
+    text = " ".join(strip_html(html).split())
+    if len(text) > length:
+        text = text[:length].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+    return text
+
+
+def parse_document(
+    content: bytes, headers: Dict[str, str], url: str
+) -> feedparser.FeedParserDict:
+    """Parse a downloaded feed body without letting feedparser touch the network."""
+    headers = dict(headers)
+    headers["content-location"] = url
+    return feedparser.parse(content, response_headers=headers)
+
+
+def parse_new_entries(
+    content: bytes, headers: Dict[str, str], url: str, since: datetime
+) -> Optional[List[Dict]]:
+    """Get the entries of a feed body published after since.
+
+    Tries the streaming parser first and falls back to a full feedparser parse
+    when the document is not well-formed or not ordered newest first. Relative
+    links are resolved against url, or the xml:base in effect, either way.
+
+    Returns:
+        List of entry dicts, or None if the feed could not be parsed or has
+        no entries at all
+    """
+    try:
+        return list(iter_new_entries(content, since, url))
+    except NoEntries:
+        return None
+    except (ET.ParseError, NotDateOrdered):
+        pass
+
+    feed_data = parse_document(content, headers, url)
+    if feed_data.get("bozo", 1) == 1 or not feed_data.entries:
+        return None
+
+    new_entries = []
+    for entry in feed_data.entries:
+        published = entry.get("published") or entry.get("updated", "")
+        entry_date = parse_date(published)
+        if entry_date and entry_date > since:
+            new_entries.append(
+                {
+                    "guid": entry.get("id") or entry.get("link", ""),
+                    "title": entry.get("title", "No title"),
+                    "link": entry.get("link", ""),
+                    "description": entry.get("description", ""),
+                    "published": published,
+                    "content": (
+                        entry.get("content", [{"value": ""}])[0]["value"]
+                        if "content" in entry
+                        else entry.get("description", "")
+                    ),
+                }
+            )
+    return new_entries
+
+
+def parse_entry_tuples(
+    content: bytes, headers: Dict[str, str], url: str, since: datetime
+) -> Optional[List[Tuple[str, ...]]]:
+    """Process pool entry point for parse_new_entries.
+
+    Returns each entry as a tuple of its ENTRY_FIELDS values, which pickles
+    much smaller than a dict, or None if the feed could not be parsed.
+    """
+    new_entries = parse_new_entries(content, headers, url, since)
+    if new_entries is None:
+        return None
+    return [tuple(entry[field] for field in ENTRY_FIELDS) for entry in new_entries]
+
+
+def iter_new_entries(
+    content: bytes, since: datetime, base_url: str = "", lookahead: int = 2
+) -> Iterator[Dict]:
+    """Stream the entries of an RSS or Atom document published after since.
+
+    Entries are built one at a time from incremental XML events and parsing
+    stops shortly after the first entry that is not newer than since, so the
+    cost depends on the number of new entries rather than the document size.
+
+    Args:
+        content: The raw feed document
+        since: Only entries published after this date are yielded
+        base_url: URL the document was fetched from, to resolve relative links
+        lookahead: Old entries to read past the cut-off to confirm the ordering
+
+    Raises:
+        NotDateOrdered: If an entry has no usable date or is newer than the
+            entry before it; entries already yielded should be discarded
+        NoEntries: If the document has no item or entry elements
+        xml.etree.ElementTree.ParseError: If the document is not well-formed
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    # The base URL in effect for each open element, as set by xml:base
+    bases = [base_url]
+    previous = None
+    seen = False
+    old_entries = 0
+    for offset in range(0, len(content), CHUNK_SIZE):
+        parser.feed(content[offset : offset + CHUNK_SIZE])
+        for event, element in parser.read_events():
+            if event == "start":
+                bases.append(urljoin(bases[-1], element.get(XML_BASE, "")))
+                continue
+            base = bases.pop()
+            if _local_name(element.tag) not in ENTRY_TAGS:
+                continue
+            seen = True
+            entry = _build_entry(element, base)
+            element.clear()
+
+            entry_date = parse_date(entry["published"])
+            if entry_date is None or (previous and entry_date > previous):
+                raise NotDateOrdered(entry["link"])
+            previous = entry_date
+
+            if entry_date > since:
+                yield entry
+            else:
+                old_entries += 1
+                if old_entries > lookahead:
+                    return
+    parser.close()
+    if not seen:
+        raise NoEntries()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(element: ET.Element) -> str:
+    """Get the text of an element, serialising inline XHTML children."""
+    if not len(element):
+        return (element.text or "").strip()
+
+    for child in element.iter():
+        child.tag = _local_name(child.tag)
+    # Atom wraps XHTML content in a single div that is not part of the content
+    if (
+        len(element) == 1
+        and element[0].tag == "div"
+        and not (element.text or "").strip()
+    ):
+        element = element[0]
+    parts = [element.text or ""]
+    parts.extend(ET.tostring(child, encoding="unicode") for child in element)
+    return "".join(parts).strip()
+
+
+def _build_entry(element: ET.Element, base: str = "") -> Dict:
+    """Map an RSS item or Atom entry element to an entry dict.
+
+    Links are resolved against base and any xml:base of the link element.
+    """
+    fields = {}
+    link = ""
+    for child in element:
+        name = _local_name(child.tag)
+        if name == "link":
+            link_base = urljoin(base, child.get(XML_BASE, ""))
+            # Atom links carry the URL in href, RSS links in their text
+            if child.get("href"):
+                if not link or child.get("rel", "alternate") == "alternate":
+                    link = urljoin(link_base, child.get("href").strip())
+            elif child.text:
+                link = urljoin(link_base, child.text.strip())
+        elif name not in fields:
+            fields[name] = _text(child)
+
+    description = fields.get("description") or fields.get("summary", "")
+    return {
+        # RSS items identify themselves with guid, Atom entries with id
+        "guid": fields.get("guid") or fields.get("id") or link,
+        "title": fields.get("title") or "No title",
+        "link": link,
+        "description": description,
+        "published": (
+            fields.get("pubDate")
+            or fields.get("published")
+            or fields.get("date")
+            or fields.get("updated", "")
+        ),
+        "content": fields.get("encoded") or fields.get("content") or description,
+    }
@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Union
+from .compression import unpack_text
+
+
+class Record:
+    """Mapping-style access for the record types below.
+
+    Records are tuples, so they carry no per-row dict, but callers can keep
+    using row["field"] and row.get("field") as with the old dict rows.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            # Only fields are keys, not tuple methods or computed properties
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+
+class EntryText:
+    """Decompression of the description and content of entry records.
+
+    Both are kept as stored, possibly compressed, until an article is
+    actually displayed.
+    """
+
+    __slots__ = ()
+
+    @property
+    def description_text(self) -> str:
+        return unpack_text(self.description) or ""
+
+    @property
+    def content_text(self) -> str:
+        """The content, or the description for entries stored without one."""
+        return unpack_text(self.content) or self.description_text
+
+
+class _Feed(NamedTuple):
+    id: int
+    url: str
+    title: str
+    last_updated: Optional[datetime]
+    enabled: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+    redirect_url: Optional[str]
+    next_poll: Optional[int]
+    poll_interval: Optional[int]
+    content_hash: Optional[str]
+
+
+class Feed(Record, _Feed):
+    """A row of the feeds table."""
+
+    __slots__ = ()
+
+
+class _Entry(NamedTuple):
+    id: int
+    feed_id: int
+    guid: str
+    title: str
+    link: str
+    description: Optional[Union[str, bytes]]
+    content: Optional[Union[str, bytes]]
+    published: str
+    published_ts: Optional[int]
+    category_id: int
+    is_read: bool
+    feed_title: str
+    category: str
+
+
+class Entry(Record, EntryText, _Entry):
+    """A full entry, with the title of its feed and the name of its category."""
+
+    __slots__ = ()
+
+
+class _EntrySummary(NamedTuple):
+    id: int
+    feed_id: int
+    title: str
+    link: str
+    published: str
+    published_ts: Optional[int]
+    is_read: bool
+    feed_title: str
+    category: str
+
+
+class EntrySummary(Record, _EntrySummary):
+    """An entry without its description and content, for list views."""
+
+    __slots__ = ()
+
+
+class _DigestEntry(NamedTuple):
+    category: str
+    feed_title: str
+    title: str
+    link: str
+    published_ts: Optional[int]
+    summary_text: Optional[str]
+
+
+class DigestEntry(Record, _DigestEntry):
+    """An entry as listed in a digest, with its plain-text summary."""
+
+    __slots__ = ()
+
+
+class _RetentionPolicy(NamedTuple):
+    feed_url: Optional[str]
+    category: Optional[str]
+    keep_days: Optional[int]
+    keep_read_days: Optional[int]
+    content_days: Optional[int]
+
+
+class RetentionPolicy(Record, _RetentionPolicy):
+    """How long entries of a feed or category are kept; None means forever."""
+
+    __slots__ = ()
+
+
+class _SearchResult(NamedTuple):
+    id: int
+    feed_id: int
+    title: str
+    link: str
+    published: str
+    published_ts: Optional[int]
+    is_read: bool
+    feed_title: str
+    category: str
+    snippet: str
+    rank: float
+
+
+class SearchResult(Record, _SearchResult):
+    """An entry summary matching a search, with a highlighted snippet and its BM25 rank."""
+
+    __slots__ = ()
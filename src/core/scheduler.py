@@ -0,0 +1,129 @@
+import heapq
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bounds for the learned polling interval, in seconds
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 24 * 60 * 60
+DEFAULT_INTERVAL = 60 * 60
+
+
+def estimate_interval(timestamps: List[float], now: Optional[float] = None) -> int:
+    """Estimate how often a feed should be polled from its recent publish times.
+
+    Polls twice per typical gap between entries, and backs off for feeds that
+    have been silent for much longer than that.
+
+    Args:
+        timestamps: POSIX timestamps of the feed's recent entries
+        now: Current time, defaults to time.time()
+
+    Returns:
+        Polling interval in seconds, clamped to [MIN_INTERVAL, MAX_INTERVAL]
+    """
+    if len(timestamps) < 2:
+        return DEFAULT_INTERVAL
+
+    now = time.time() if now is None else now
+    ordered = sorted(timestamps, reverse=True)
+    gaps = [newer - older for newer, older in zip(ordered, ordered[1:])]
+    gaps = [gap for gap in gaps if gap > 0]
+    if not gaps:
+        return DEFAULT_INTERVAL
+
+    interval = statistics.median(gaps) / 2
+    silence = now - ordered[0]
+    if silence > 2 * interval:
+        interval = max(interval, silence / 4)
+    return int(min(max(interval, MIN_INTERVAL), MAX_INTERVAL))
+
+
+class PollScheduler:
+    """Polls each feed on its own learned cadence.
+
+    Feeds are kept on a heap ordered by their next due time, which is persisted
+    in the feeds table so a restarted daemon resumes where it left off.
+    """
+
+    def __init__(self, feed_manager, max_workers: int = 8, per_host_limit: int = 2):
+        self.feed_manager = feed_manager
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.queue: List[Tuple[float, str]] = []
+        self.scheduled = set()
+
+    def sync(self) -> None:
+        """Pick up feeds that were added since the schedule was built."""
+        self.feed_manager.reload_feeds()
+        now = time.time()
+        for url, feed in self.feed_manager.feeds.items():
+            if url in self.scheduled or not feed["enabled"]:
+                continue
+            due = feed.get("next_poll")
+            if due is None or due < now:
+                # Spread new and overdue feeds out instead of polling them all at once
+                interval = feed.get("poll_interval") or MIN_INTERVAL
+                due = now + random.uniform(0, min(interval, MIN_INTERVAL))
+            heapq.heappush(self.queue, (due, url))
+            self.scheduled.add(url)
+
+    def run_once(self, callback: Optional[Callable[[Dict], None]] = None) -> float:
+        """Refresh every feed that is due and reschedule it.
+
+        Returns:
+            POSIX time at which the next feed is due
+        """
+        self.sync()
+        now = time.time()
+        due_urls = []
+        while self.queue and self.queue[0][0] <= now:
+            _, url = heapq.heappop(self.queue)
+            self.scheduled.discard(url)
+            feed = self.feed_manager.feeds.get(url)
+            if feed and feed["enabled"]:
+                due_urls.append(url)
+
+        if due_urls:
+            self.feed_manager.refresh_all(
+                max_workers=self.max_workers,
+                per_host_limit=self.per_host_limit,
+                callback=lambda result: self._reschedule(result, callback),
+                urls=due_urls,
+            )
+        return self.queue[0][0] if self.queue else now + MIN_INTERVAL
+
+    def run(self, callback: Optional[Callable[[Dict], None]] = None) -> None:
+        """Poll feeds until interrupted."""
+        while True:
+            next_due = self.run_once(callback)
+            # Wake up at least every MIN_INTERVAL to pick up newly added feeds
+            time.sleep(
+                max(0.0, min(next_due, time.time() + MIN_INTERVAL) - time.time())
+            )
+
+    def _reschedule(
+        self, result: Dict, callback: Optional[Callable[[Dict], None]]
+    ) -> None:
+        url = result["url"]
+        feed = self.feed_manager.feeds.get(url)
+        if feed is None:
+            # Removed while it was being refreshed, so it is not polled again
+            return
+        previous = feed.get("poll_interval") or DEFAULT_INTERVAL
+        if result["success"]:
+            interval = estimate_interval(self.feed_manager.get_publish_times(url))
+        else:
+            # Back off from feeds that keep failing
+            interval = min(previous * 2, MAX_INTERVAL)
+
+        # A little jitter keeps feeds with the same cadence from clustering
+        next_poll = int(time.time() + interval * random.uniform(0.9, 1.1))
+        self.feed_manager.update_poll_schedule(url, next_poll, interval)
+        heapq.heappush(self.queue, (next_poll, url))
+        self.scheduled.add(url)
+
+        result["next_poll"] = next_poll
+        if callback:
+            callback(result)
@@ -0,0 +1,115 @@
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, NamedTuple, Optional
+
+# urllib3 only decodes brotli when one of the brotli packages is installed
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = "ReadLess/0.1"
+ACCEPT = (
+    "application/rss+xml, application/atom+xml, application/xml;q=0.9, "
+    "text/xml;q=0.9, */*;q=0.8"
+)
+PERMANENT_REDIRECTS = (301, 308)
+
+
+class FetchResponse(NamedTuple):
+    status: int
+    content: bytes
+    headers: Dict[str, str]
+    url: str
+    permanent_redirect: Optional[str]
+
+
+class Transport:
+    """HTTP client shared by all feed requests.
+
+    Wraps a single requests.Session so connections (and their TLS sessions)
+    are kept alive and reused across feeds served from the same host.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 64,
+        pool_maxsize: int = 4,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+    ):
+        """Create the session and its per-host connection pools.
+
+        Args:
+            pool_connections: Number of host pools kept alive
+            pool_maxsize: Connections kept alive per host
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait between bytes of the response
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "User-Agent": USER_AGENT,
+                "Accept": ACCEPT,
+                "Accept-Encoding": ACCEPT_ENCODING,
+            }
+        )
+
+    def fetch(
+        self, url: str, etag: Optional[str] = None, modified: Optional[str] = None
+    ) -> FetchResponse:
+        """Fetch a feed document, sending conditional request headers if given.
+
+        Args:
+            url: The URL to fetch
+            etag: ETag of the previously fetched document
+            modified: Last-Modified value of the previously fetched document
+
+        Returns:
+            FetchResponse with the decoded body, or an empty body for a 304
+
+        Raises:
+            requests.RequestException: On network errors and 4xx/5xx responses
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if modified:
+            headers["If-Modified-Since"] = modified
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+
+        # Only follow the chain of permanent redirects from the original URL
+        permanent_redirect = None
+        for hop in response.history:
+            if hop.status_code not in PERMANENT_REDIRECTS:
+                break
+            permanent_redirect = requests.compat.urljoin(
+                hop.url, hop.headers["Location"]
+            )
+
+        return FetchResponse(
+            status=response.status_code,
+            content=response.content,
+            headers={key.lower(): value for key, value in response.headers.items()},
+            url=response.url,
+            permanent_redirect=permanent_redirect,
+        )
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
@@ -0,0 +1,122 @@
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Seconds between batches written by the background thread
+FLUSH_INTERVAL = 0.3
+
+EntryKey = Union[int, str]
+
+
+def group_by_value(
+    changes: Dict[EntryKey, object]
+) -> Dict[object, Tuple[List[int], List[str]]]:
+    """Turn {entry id or link: new value} into {new value: (ids, links)}."""
+    groups: Dict[object, Tuple[List[int], List[str]]] = {}
+    for key, value in changes.items():
+        entry_ids, entry_links = groups.setdefault(value, ([], []))
+        (entry_ids if isinstance(key, int) else entry_links).append(key)
+    return groups
+
+
+class WriteBehindQueue:
+    """Applies read status and category changes from a background thread.
+
+    Callers only record the change in memory. Repeated changes to the same
+    entry are coalesced so only the latest one is written, and everything
+    queued during an interval is written in a single transaction.
+    """
+
+    def __init__(
+        self,
+        db,
+        interval: float = FLUSH_INTERVAL,
+        on_write: Optional[Callable[[], None]] = None,
+    ):
+        """Create the queue; the writer thread starts with the first change queued.
+
+        Args:
+            db: Database to apply the changes to
+            interval: Seconds between batches
+            on_write: Called after each batch is written, e.g. to drop caches
+        """
+        self.db = db
+        self.interval = interval
+        self.on_write = on_write
+        self._read_status: Dict[EntryKey, bool] = {}
+        self._categories: Dict[EntryKey, str] = {}
+        self._lock = threading.Lock()
+        # Serialises flushes from the writer thread and from callers
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_read_status(
+        self, links_or_ids: Union[EntryKey, Sequence[EntryKey]], is_read: bool
+    ) -> None:
+        """Queue marking entries, given by id or link, as read or unread."""
+        if isinstance(links_or_ids, (int, str)):
+            links_or_ids = [links_or_ids]
+        with self._lock:
+            for key in links_or_ids:
+                self._read_status[key] = is_read
+            self._start()
+
+    def set_category(self, links_or_ids: Sequence[EntryKey], category: str) -> None:
+        """Queue moving entries, given by id or link, to a category."""
+        with self._lock:
+            for key in links_or_ids:
+                self._categories[key] = category
+            self._start()
+
+    def pending(self) -> bool:
+        """Whether there are changes that have not been written yet."""
+        with self._lock:
+            return bool(self._read_status or self._categories)
+
+    def flush(self) -> bool:
+        """Write all queued changes now.
+
+        Returns:
+            bool: True if everything was written; on failure the changes stay
+            queued and are retried with the next batch
+        """
+        with self._flush_lock:
+            with self._lock:
+                read_status, self._read_status = self._read_status, {}
+                categories, self._categories = self._categories, {}
+            if not read_status and not categories:
+                return True
+
+            if self.db.apply_entry_changes(
+                group_by_value(read_status), group_by_value(categories)
+            ):
+                if self.on_write:
+                    self.on_write()
+                return True
+
+            # Put the batch back without overriding anything queued since
+            with self._lock:
+                self._read_status = {**read_status, **self._read_status}
+                self._categories = {**categories, **self._categories}
+            return False
+
+    def close(self) -> bool:
+        """Stop the writer thread and write whatever is still queued."""
+        self._stop.set()
+        with self._lock:
+            thread = self._thread
+        if thread:
+            thread.join()
+        return self.flush()
+
+    def _start(self) -> None:
+        """Start the writer thread if it is not running; called with _lock held."""
+        if self._thread is None and not self._stop.is_set():
+            self._thread = threading.Thread(
+                target=self._run, name="readless-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
@@ -12,8 +12,9 @@ from PySide6.QtWidgets import (
     QPushButton,
     QDialog,
     QApplication,
+    QLineEdit,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QColor
 
 
@@ -21,6 +22,8 @@ class AllEntriesTab(QWidget):
     def __init__(self, feed_manager):
         super().__init__()
         self.feed_manager = feed_manager
+        self.articles = {}  # Entry records by id; tree items only hold the id
+        self.category_items = {}  # Top-level tree items by category name
         layout = QVBoxLayout(self)
 
         # Article list and content splitter
@@ -39,6 +42,14 @@ class AllEntriesTab(QWidget):
         self.article_tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.article_tree.customContextMenuRequested.connect(self.show_context_menu)
         tree_layout.addWidget(QLabel("Articles by Category"))
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search articles...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.returnPressed.connect(self.search_articles)
+        self.search_box.textChanged.connect(
+            lambda text: self.refresh_articles() if not text else None
+        )
+        tree_layout.addWidget(self.search_box)
         tree_layout.addWidget(self.article_tree)
 
         # Content panel
@@ -65,18 +76,19 @@ class AllEntriesTab(QWidget):
     def refresh_articles(self):
         self.article_tree.clear()
         categories = self.feed_manager.get_categories()
-        articles = self.feed_manager.get_all_entries()
+        self.articles = {}
 
         # Create category items
-        category_items = {}
+        self.category_items = {}
         for category in categories:
             category_item = QTreeWidgetItem([category])
             self.article_tree.addTopLevelItem(category_item)
-            category_items[category] = category_item
+            self.category_items[category] = category_item
 
-        # Add articles under their categories
-        for article in articles:
-            category = self.feed_manager.get_entry_category(article["link"])
+        # Add articles under their categories, streamed page by page
+        for article in self.feed_manager.iter_entries(summaries=True):
+            self.articles[article["id"]] = article
+            category = article["category"]
             article_item = QTreeWidgetItem(
                 [
                     f"{'● ' if not article.get('is_read', False) else ''}{article['feed_title']} - {article['title']}"
@@ -86,9 +98,38 @@ class AllEntriesTab(QWidget):
                 article_item.setForeground(0, QColor("black"))
             else:
                 article_item.setForeground(0, QColor("red"))
-            article_item.setData(0, Qt.UserRole, article)
-            if category in category_items:
-                category_items[category].addChild(article_item)
+            article_item.setData(0, Qt.UserRole, article["id"])
+            if category in self.category_items:
+                self.category_items[category].addChild(article_item)
+
+        self.article_tree.expandAll()
+
+    def search_articles(self):
+        query = self.search_box.text().strip()
+        if not query:
+            self.refresh_articles()
+            return
+
+        self.article_tree.clear()
+        self.category_items = {}
+        results = self.feed_manager.search(query, limit=200)
+        self.articles = {result["id"]: result for result in results}
+        results_item = QTreeWidgetItem(
+            [f'Search results for "{query}" ({len(results)})']
+        )
+        self.article_tree.addTopLevelItem(results_item)
+        for result in results:
+            article_item = QTreeWidgetItem(
+                [
+                    f"{'● ' if not result['is_read'] else ''}{result['feed_title']} - {result['title']}"
+                ]
+            )
+            article_item.setForeground(
+                0, QColor("black") if result["is_read"] else QColor("red")
+            )
+            article_item.setToolTip(0, " ".join(result["snippet"].split()))
+            article_item.setData(0, Qt.UserRole, result["id"])
+            results_item.addChild(article_item)
 
         self.article_tree.expandAll()
 
@@ -96,9 +137,10 @@ class AllEntriesTab(QWidget):
         if not current or not current.data(0, Qt.UserRole):
             return
 
-        article = current.data(0, Qt.UserRole)
+        article = self.articles[current.data(0, Qt.UserRole)]
         if not article.get("is_read", False):
-            self.feed_manager.set_entry_read_status(article["link"], True)
+            self.feed_manager.queue_read_status(article["id"], True)
+            self.articles[article["id"]] = article._replace(is_read=True)
             current.setText(0, current.text(0).replace("● ", ""))
             current.setForeground(0, QColor("black"))
         content = f"<h2>{article['title']}</h2>"
@@ -106,10 +148,31 @@ class AllEntriesTab(QWidget):
         if article["published"]:
             content += f"<p><i>Published: {article['published']}</i></p>"
         content += f"<p><a href=\"{article['link']}\">Original Article</a></p>"
-        content += f"<div>{article['content']}</div>"
+        # The list only holds summaries; bodies are loaded when opened
+        body = self.feed_manager.get_entry_body(article["id"])
+        content += f"<div>{body or ''}</div>"
 
         self.content_view.setHtml(content)
 
+        # Load the neighbouring articles once this one is on screen, so
+        # stepping through the list does not wait on the database
+        neighbour_ids = self._neighbour_ids(current)
+        QTimer.singleShot(
+            0, lambda: self.feed_manager.prefetch_entry_bodies(neighbour_ids)
+        )
+
+    def _neighbour_ids(self, item, count=2):
+        entry_ids = []
+        for step in (self.article_tree.itemAbove, self.article_tree.itemBelow):
+            neighbour = item
+            for _ in range(count):
+                neighbour = step(neighbour)
+                if neighbour is None:
+                    break
+                if neighbour.data(0, Qt.UserRole):
+                    entry_ids.append(neighbour.data(0, Qt.UserRole))
+        return entry_ids
+
     def show_context_menu(self, position):
         selected_items = self.article_tree.selectedItems()
         valid_items = [item for item in selected_items if item.data(0, Qt.UserRole)]
@@ -146,17 +209,21 @@ class AllEntriesTab(QWidget):
         menu.exec_(self.article_tree.viewport().mapToGlobal(position))
 
     def set_articles_read_status(self, items, is_read):
-        links = [item.data(0, Qt.UserRole)["link"] for item in items]
-        if self.feed_manager.set_entry_read_status(links, is_read):
-            for item in items:
-                text = item.text(0)
-                if is_read:
-                    text = text.replace("● ", "")
-                else:
-                    if not text.startswith("● "):
-                        text = "● " + text
-                item.setText(0, text)
-                item.setForeground(0, QColor("black") if is_read else QColor("red"))
+        articles = [self.articles[item.data(0, Qt.UserRole)] for item in items]
+        self.feed_manager.queue_read_status(
+            [article["id"] for article in articles], is_read
+        )
+        for article in articles:
+            self.articles[article["id"]] = article._replace(is_read=is_read)
+        for item in items:
+            text = item.text(0)
+            if is_read:
+                text = text.replace("● ", "")
+            else:
+                if not text.startswith("● "):
+                    text = "● " + text
+            item.setText(0, text)
+            item.setForeground(0, QColor("black") if is_read else QColor("red"))
 
     def fetch_all_feeds(self):
         # Create progress dialog
@@ -178,32 +245,44 @@ class AllEntriesTab(QWidget):
         self._fetch_feeds_with_progress()
 
     def _fetch_feeds_with_progress(self):
-        feeds = self.feed_manager.feeds
-        for url, feed in feeds.items():
-            if feed["enabled"]:
-                self.progress_label.setText(f'Fetching: {feed["title"]}')
-                self.feed_log.append(f'Fetching: {feed["title"]}')
-                QApplication.processEvents()  # Update UI
-                new_entries, count = self.feed_manager.refresh_feed(url)
-                if new_entries:
-                    self.feed_log.append(f"Added {count} new entries")
-                    current_count = int(self.new_entries_label.text().split(": ")[1])
-                    self.new_entries_label.setText(
-                        f"New entries added: {current_count + count}"
-                    )
-                else:
-                    self.progress_label.setText(f'Failed to fetch: {feed["title"]}')
-                    self.feed_log.append(f'Failed to fetch: {feed["title"]}')
-                    QApplication.processEvents()
+        self.progress_label.setText("Fetching feeds...")
+        QApplication.processEvents()  # Update UI
+        self.feed_manager.refresh_all(callback=self._on_feed_fetched)
 
         self.progress_dialog.close()
         self.refresh_articles()
 
+    def _on_feed_fetched(self, result):
+        if result["status"] == "not_modified":
+            self.feed_log.append(f'Not modified: {result["title"]}')
+        elif result["status"] == "unchanged":
+            self.feed_log.append(f'Unchanged: {result["title"]}')
+        elif result["success"]:
+            self.progress_label.setText(f'Fetched: {result["title"]}')
+            self.feed_log.append(
+                f'Added {result["count"]} new entries from {result["title"]}'
+            )
+            current_count = int(self.new_entries_label.text().split(": ")[1])
+            self.new_entries_label.setText(
+                f"New entries added: {current_count + result['count']}"
+            )
+        else:
+            self.progress_label.setText(f'Failed to fetch: {result["title"]}')
+            self.feed_log.append(f'Failed to fetch: {result["title"]}')
+        QApplication.processEvents()
+
     def change_articles_category(self, items, new_category):
-        success = True
+        entry_ids = [item.data(0, Qt.UserRole) for item in items]
+        self.feed_manager.queue_entries_category(entry_ids, new_category)
+
+        # Move the items instead of rebuilding the whole tree
+        target = self.category_items.get(new_category)
         for item in items:
-            article = item.data(0, Qt.UserRole)
-            if not self.feed_manager.set_entry_category(article["link"], new_category):
-                success = False
-        if success:
-            self.refresh_articles()
+            entry_id = item.data(0, Qt.UserRole)
+            self.articles[entry_id] = self.articles[entry_id]._replace(
+                category=new_category
+            )
+            parent = item.parent()
+            if target is not None and parent is not None and parent is not target:
+                parent.removeChild(item)
+                target.addChild(item)
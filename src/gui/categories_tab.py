@@ -57,14 +57,14 @@ class CategoriesTab(QWidget):
 
     def edit_category(self):
         current_item = self.category_list.currentItem()
-        if not current_item or current_item.text() == "Uncategorized":
+        if not current_item or current_item.data(Qt.UserRole) == "Uncategorized":
             return
 
         new_name = self.category_input.text().strip()
         if not new_name:
             return
 
-        if self.feed_manager.rename_category(current_item.text(), new_name):
+        if self.feed_manager.rename_category(current_item.data(Qt.UserRole), new_name):
             self.category_input.clear()
             self.refresh_categories()
         else:
@@ -72,20 +72,20 @@ class CategoriesTab(QWidget):
 
     def remove_category(self):
         current_item = self.category_list.currentItem()
-        if not current_item or current_item.text() == "Uncategorized":
+        if not current_item or current_item.data(Qt.UserRole) == "Uncategorized":
             return
 
         if (
             QMessageBox.question(
                 self,
                 "Confirm Deletion",
-                f"Are you sure you want to delete category '{current_item.text()}'?"
+                f"Are you sure you want to delete category '{current_item.data(Qt.UserRole)}'?"
                 "\nAll entries will be moved to Uncategorized.",
                 QMessageBox.Yes | QMessageBox.No,
             )
             == QMessageBox.Yes
         ):
-            if self.feed_manager.remove_category(current_item.text()):
+            if self.feed_manager.remove_category(current_item.data(Qt.UserRole)):
                 self.refresh_categories()
             else:
                 QMessageBox.warning(self, "Error", "Failed to remove category.")
@@ -99,5 +99,12 @@ class CategoriesTab(QWidget):
             cat for cat in categories if cat != "Uncategorized"
         )
 
+        unread_counts = self.feed_manager.get_unread_counts()["categories"]
         for category in sorted_categories:
-            self.category_list.addItem(category)
+            text = category
+            if unread_counts.get(category):
+                text += f" ({unread_counts[category]})"
+            # The label carries the unread badge, the item data the name
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, category)
+            self.category_list.addItem(item)
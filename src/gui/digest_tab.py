@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import QDate, Qt
 from datetime import datetime, timedelta
+from core.digest import markdown_digest
 from core.feed_manager import FeedManager
 
 
@@ -100,33 +101,9 @@ class DigestTab(QWidget):
         start_date = self.start_date.date().toPython()
         end_date = self.end_date.date().toPython()
 
-        # Get entries from database
-        entries = self.feed_manager.get_entries_by_date_range(start_date, end_date)
-
-        # Group entries by category
-        categories = {}
-        for entry in entries:
-            category = entry.get("category", "Uncategorized")
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(entry)
-
-        from bs4 import BeautifulSoup
-
-        # Generate markdown
-        # Generate markdown with specified header levels
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        end_date_str = end_date.strftime("%Y-%m-%d")
-        markdown = f"# RSS Digest from {start_date_str} to {end_date_str}\n\n"
-        for category, entries in categories.items():
-            markdown += f"## {category}\n\n"
-            for entry in entries:
-                markdown += f'### [{entry["title"]}]({entry["link"]})\n'
-                if entry.get("description"):
-                    # Use BeautifulSoup to remove HTML tags from description
-                    soup = BeautifulSoup(entry["description"], "html.parser")
-                    clean_description = soup.get_text()
-                    markdown += f"{clean_description}\n"
-            markdown += "\n"
+        # Entries come grouped by category with their summaries already
+        # stripped of HTML at ingest
+        entries = self.feed_manager.iter_digest_entries(start_date, end_date)
+        markdown = "".join(markdown_digest(entries, start_date, end_date))
 
         self.markdown_view.setMarkdown(markdown)
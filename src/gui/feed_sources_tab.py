@@ -19,6 +19,7 @@ class FeedSourcesTab(QWidget):
     def __init__(self, feed_manager):
         super().__init__()
         self.feed_manager = feed_manager
+        self.feeds = {}  # Feed records by URL; list items only hold the URL
         layout = QVBoxLayout(self)
 
         # Feed list
@@ -64,9 +65,14 @@ class FeedSourcesTab(QWidget):
         self.feed_list.clear()
         # Get and sort feeds by title
         feeds = sorted(self.feed_manager.get_feeds(), key=lambda x: x["title"].lower())
+        self.feeds = {feed["url"]: feed for feed in feeds}
+        unread_counts = self.feed_manager.get_unread_counts()["feeds"]
         for feed in feeds:
-            item = QListWidgetItem(f"{feed['title']} ({feed['url']})")
-            item.setData(Qt.UserRole, feed)
+            text = f"{feed['title']} ({feed['url']})"
+            if unread_counts.get(feed["url"]):
+                text += f" [{unread_counts[feed['url']]} unread]"
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, feed["url"])
             if not feed["enabled"]:
                 item.setFlags(item.flags() & ~Qt.ItemIsEnabled)
             self.feed_list.addItem(item)
@@ -75,15 +81,14 @@ class FeedSourcesTab(QWidget):
         current_item = self.feed_list.currentItem()
         if not current_item:
             return
-        feed = current_item.data(Qt.UserRole)
+        feed = self.feeds[current_item.data(Qt.UserRole)]
         self.edit_feed(feed)
 
     def delete_selected_feed(self):
         current_item = self.feed_list.currentItem()
         if not current_item:
             return
-        feed = current_item.data(Qt.UserRole)
-        self.delete_feed(feed["url"])
+        self.delete_feed(current_item.data(Qt.UserRole))
 
     def toggle_feed(self, url):
         self.feed_manager.toggle_feed_status(url)
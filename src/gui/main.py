@@ -70,6 +70,7 @@ class RSSReader(QMainWindow):
 def main():
     app = QApplication(sys.argv)
     window = RSSReader()
+    app.aboutToQuit.connect(window.feed_manager.close)
     window.show()
     sys.exit(app.exec())
 
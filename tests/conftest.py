@@ -0,0 +1,132 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+# The schema readless.db had before it was versioned
+BASELINE_SCHEMA = """
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE feeds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    last_updated TIMESTAMP,
+    enabled BOOLEAN DEFAULT 1
+);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    feed_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT UNIQUE NOT NULL,
+    description TEXT,
+    content TEXT,
+    published TEXT,
+    category_id INTEGER DEFAULT 1,
+    is_read BOOLEAN DEFAULT 0,
+    FOREIGN KEY (feed_id) REFERENCES feeds (id),
+    FOREIGN KEY (category_id) REFERENCES categories (id)
+);
+INSERT INTO categories (name) VALUES ('Uncategorized'), ('Tech');
+"""
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+LONG_BODY = "<p>" + " ".join(f"word{i}" for i in range(200)) + "</p>"
+
+
+def baseline_entries():
+    """Rows for the baseline entries table, as (feed_id, title, link,
+    description, content, published, category_id, is_read)."""
+    rows = []
+    for i in range(12):
+        rows.append(
+            (
+                1 if i % 2 else 2,
+                f"Entry {i}",
+                f"http://example.com/{i}",
+                LONG_BODY if i % 3 == 0 else f"<b>Short</b> {i}",
+                LONG_BODY if i % 3 == 0 else "",
+                format_datetime(NOW - timedelta(hours=i)),
+                2 if i % 4 == 0 else 1,
+                1 if i % 5 == 0 else 0,
+            )
+        )
+    # Entries without a usable date
+    for i in range(12, 15):
+        rows.append((1, f"Entry {i}", f"http://example.com/{i}", "", "", "", 1, 0))
+    return rows
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """Path to a readless.db with the baseline schema and some entries."""
+    path = str(tmp_path / "readless.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    last_updated = (NOW - timedelta(days=1)).isoformat()
+    conn.executemany(
+        "INSERT INTO feeds (url, title, last_updated) VALUES (?, ?, ?)",
+        [
+            ("http://example.com/a.xml", "A", last_updated),
+            ("http://example.com/b.xml", "B", last_updated),
+        ],
+    )
+    conn.executemany(
+        """
+        INSERT INTO entries (feed_id, title, link, description, content,
+                             published, category_id, is_read)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        baseline_entries(),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db(baseline_db):
+    from core.database import Database
+
+    database = Database(baseline_db)
+    yield database
+    database.close()
+
+
+class FakeTransport:
+    """Serves feed documents from memory instead of the network.
+
+    Each fetch calls on_fetch(url) first, if set, so tests can act while a
+    refresh is in progress.
+    """
+
+    def __init__(self, documents, on_fetch=None):
+        self.documents = documents
+        self.on_fetch = on_fetch
+        self.urls = []
+
+    def fetch(self, url, etag=None, modified=None):
+        from core.transport import FetchResponse
+
+        self.urls.append(url)
+        if self.on_fetch:
+            self.on_fetch(url)
+        return FetchResponse(
+            200, self.documents[url], {"content-type": "application/rss+xml"}, url, None
+        )
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def manager(baseline_db):
+    from core.feed_manager import FeedManager
+
+    feed_manager = FeedManager(baseline_db)
+    feed_manager.transport = FakeTransport({})
+    yield feed_manager
+    feed_manager.close()
@@ -0,0 +1,11 @@
+from click.testing import CliRunner
+
+from cli import manager
+from cli.feed_cli import cli
+
+
+def test_help_opens_no_database():
+    for args in (["--help"], ["feed", "--help"], ["digest", "--help"]):
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0, result.output
+    assert manager._feed_manager is None
@@ -0,0 +1,261 @@
+import threading
+from datetime import timedelta
+from email.utils import format_datetime
+
+from conftest import LONG_BODY, NOW
+from core import migrations
+from core.compression import unpack_text
+from core.database import Database
+from core.migrations import MIGRATIONS
+from core.parsing import summarize
+
+
+def columns(conn, table):
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def schema_names(conn, kind):
+    return {
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = ?", (kind,)
+        )
+    }
+
+
+def true_unread_counts(conn):
+    return {
+        (row["feed_id"], row["category_id"]): row["unread"]
+        for row in conn.execute(
+            """
+            SELECT feed_id, category_id, COUNT(*) AS unread FROM entries
+            WHERE is_read = 0 GROUP BY feed_id, category_id
+        """
+        )
+    }
+
+
+def stored_unread_counts(conn):
+    return {
+        (row["feed_id"], row["category_id"]): row["unread"]
+        for row in conn.execute("SELECT * FROM unread_counts")
+    }
+
+
+def test_migrates_baseline_schema(db):
+    conn = db._get_connection()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+
+    assert {"etag", "last_modified", "next_poll", "content_hash"} <= columns(
+        conn, "feeds"
+    )
+    assert {"guid", "published_ts", "summary_text"} <= columns(conn, "entries")
+    assert {"unread_counts", "retention_policies", "entries_fts"} <= schema_names(
+        conn, "table"
+    )
+    assert {
+        "idx_entries_feed_guid",
+        "idx_entries_published_ts",
+        "idx_entries_category_published_ts",
+    } <= schema_names(conn, "index")
+
+    assert conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 15
+    assert (
+        conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE published_ts IS NULL"
+        ).fetchone()[0]
+        == 3
+    )
+
+
+def test_migration_compresses_bodies_and_keeps_them_searchable(db):
+    conn = db._get_connection()
+    row = conn.execute(
+        "SELECT description, content, summary_text FROM entries WHERE link = ?",
+        ("http://example.com/0",),
+    ).fetchone()
+    assert isinstance(row["description"], bytes)
+    assert unpack_text(row["description"]) == LONG_BODY
+    # Content equal to the description is stored once
+    assert row["content"] is None
+    assert row["summary_text"].startswith("word0 word1")
+
+    assert [result.link for result in db.search("word150")] == [
+        f"http://example.com/{i}" for i in (0, 3, 6, 9)
+    ]
+
+
+def test_search_ignores_markup(db):
+    (result,) = db.search("short 4")
+    assert result.link == "http://example.com/4"
+    assert result.snippet == "[Short] [4]"
+    # Tag and attribute names are not indexed
+    assert db.search("b") == db.search("p") == []
+
+    db.upsert_entries(
+        1,
+        [
+            {
+                "guid": "markup",
+                "title": "Markup",
+                "link": "http://example.com/markup",
+                "description": '<div class="lead">Fresh</div>',
+                "content": "",
+                "published": format_datetime(NOW),
+            }
+        ],
+    )
+    assert [result.snippet.strip() for result in db.search("fresh")] == ["[Fresh]"]
+    assert db.search("div") == db.search("lead") == []
+    db.remove_feed("http://example.com/a.xml")
+    conn = db._get_connection()
+    conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('integrity-check')")
+    assert db.search("fresh") == []
+
+
+def test_migrating_again_is_a_no_op(baseline_db, db):
+    version = db._get_connection().execute("PRAGMA user_version").fetchone()[0]
+    again = Database(baseline_db)
+    try:
+        conn = again._get_connection()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == version
+        assert conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 15
+    finally:
+        again.close()
+
+
+def test_unread_counts_follow_every_write(db):
+    conn = db._get_connection()
+    assert stored_unread_counts(conn) == true_unread_counts(conn)
+
+    published = format_datetime(NOW + timedelta(hours=1))
+    db.upsert_entries(
+        1,
+        [
+            {
+                "guid": f"new-{i}",
+                "title": f"New {i}",
+                "link": f"http://example.com/new/{i}",
+                "description": "",
+                "content": "",
+                "published": published,
+            }
+            for i in range(3)
+        ],
+    )
+    assert stored_unread_counts(conn) == true_unread_counts(conn)
+
+    db.mark_entries_read(feed_url="http://example.com/a.xml")
+    assert stored_unread_counts(conn) == true_unread_counts(conn)
+
+    db.set_entries_category("Tech", entry_ids=[2, 3, 4])
+    db.set_entry_read_status(["http://example.com/1"], False)
+    assert stored_unread_counts(conn) == true_unread_counts(conn)
+
+    db.remove_feed("http://example.com/b.xml")
+    assert stored_unread_counts(conn) == true_unread_counts(conn)
+    assert db.get_unread_counts()["feeds"] == {"http://example.com/a.xml": 1}
+
+
+def test_keyset_paging_matches_a_full_sort(db):
+    conn = db._get_connection()
+    for order, direction in (("desc", "DESC"), ("asc", "ASC")):
+        nulls = "LAST" if order == "desc" else "FIRST"
+        expected = [
+            row["id"]
+            for row in conn.execute(
+                f"""
+                SELECT id FROM entries
+                ORDER BY published_ts IS NULL {'ASC' if nulls == 'LAST' else 'DESC'},
+                         published_ts {direction}, id {direction}
+            """
+            )
+        ]
+        for page_size in (1, 2, 4, 100):
+            paged = [
+                entry.id
+                for entry in db.iter_entries(
+                    order=order, page_size=page_size, summaries=True
+                )
+            ]
+            assert paged == expected, (order, page_size)
+
+        # Resuming from any entry continues with the ones after it
+        entries = list(db.iter_entries(order=order, page_size=3))
+        for position in (0, 5, 11, 12, 13):
+            after = (entries[position].published_ts, entries[position].id)
+            resumed = [entry.id for entry in db.iter_entries(order=order, after=after)]
+            assert resumed == expected[position + 1 :], (order, position)
+
+
+def test_paging_applies_filters(db):
+    entries = list(
+        db.iter_entries({"category": "Tech", "unread_only": True}, page_size=1)
+    )
+    assert [entry.link for entry in entries] == [
+        "http://example.com/4",
+        "http://example.com/8",
+    ]
+
+
+def test_concurrent_migrations_run_once(baseline_db, monkeypatch):
+    # Small batches give the other connections many chances to get in between
+    monkeypatch.setattr(migrations, "BATCH_SIZE", 2)
+    errors = []
+
+    def open_database():
+        try:
+            Database(baseline_db).close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_database) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    db = Database(baseline_db)
+    try:
+        conn = db._get_connection()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        indexed = conn.execute("SELECT COUNT(*) FROM entries_fts_docsize")
+        assert indexed.fetchone()[0] == 15
+        conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('integrity-check')")
+        assert stored_unread_counts(conn) == true_unread_counts(conn)
+    finally:
+        db.close()
+
+
+def test_retention_policies(db):
+    db.upsert_entries(
+        1,
+        [
+            {
+                "guid": "separate",
+                "title": "Separate content",
+                "link": "http://example.com/separate",
+                "description": "Teaser",
+                "content": "<p>The whole article</p>",
+                "published": format_datetime(NOW - timedelta(hours=2)),
+            }
+        ],
+    )
+    db.set_retention_policy(feed_url="http://example.com/b.xml", keep_days=1)
+    # Feeds with their own policy do not follow their entries' category's
+    db.set_retention_policy(category="Uncategorized", keep_read_days=0, content_days=0)
+    now = (NOW + timedelta(days=1, hours=-5)).timestamp()
+
+    assert db.apply_retention(now) == {"deleted": 4, "stripped": 3}
+    entries = {entry.link: entry for entry in db.iter_entries()}
+    # Older than a day in feed B, and read in Uncategorized
+    assert not set(entries) & {f"http://example.com/{i}" for i in (5, 6, 8, 10)}
+    assert len(entries) == 12
+    assert entries["http://example.com/separate"].content_text == "Teaser"
+    # Entries whose content is their description keep its summary,
+    assert entries["http://example.com/3"].content_text == summarize(LONG_BODY)
+    # and are only found by the words in it
+    assert [result.link for result in db.search("word150")] == ["http://example.com/0"]
+
+    assert db.apply_retention(now) == {"deleted": 0, "stripped": 0}
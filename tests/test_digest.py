@@ -0,0 +1,97 @@
+import json
+from datetime import date
+from html.parser import HTMLParser
+
+import pytest
+
+from cli.digest_commands import _write_chunks
+from core.digest import html_digest, json_digest, markdown_digest
+from core.records import DigestEntry
+
+START = date(2024, 4, 25)
+END = date(2024, 5, 1)
+ENTRIES = [
+    DigestEntry("News", "Daily", "Rates <rise>", "http://a/1?x=1&y=2", 1714564800, ""),
+    DigestEntry("News", "Daily", 'Say "hi"', "http://a/2", None, "Short & sweet"),
+    DigestEntry("Tech", "Blog", "Release", "http://b/1", 1714478400, None),
+]
+
+
+def render(renderer, entries=ENTRIES):
+    return "".join(renderer(iter(entries), START, END))
+
+
+def test_markdown_digest():
+    assert render(markdown_digest) == (
+        "# RSS Digest from 2024-04-25 to 2024-05-01\n\n"
+        "## News\n\n"
+        "### [Rates <rise>](http://a/1?x=1&y=2)\n"
+        '### [Say "hi"](http://a/2)\n'
+        "Short & sweet\n\n"
+        "## Tech\n\n"
+        "### [Release](http://b/1)\n\n"
+    )
+
+
+def test_json_digest():
+    document = json.loads(render(json_digest))
+    assert document["start"] == "2024-04-25" and document["end"] == "2024-05-01"
+    assert [category["name"] for category in document["categories"]] == [
+        "News",
+        "Tech",
+    ]
+    first, second = document["categories"][0]["entries"]
+    assert first == {
+        "title": "Rates <rise>",
+        "link": "http://a/1?x=1&y=2",
+        "feed": "Daily",
+        "published": "2024-05-01T12:00:00+00:00",
+        "summary": "",
+    }
+    assert second["published"] is None and second["summary"] == "Short & sweet"
+    assert json.loads(render(json_digest, [])) == {
+        "start": "2024-04-25",
+        "end": "2024-05-01",
+        "categories": [],
+    }
+
+
+def test_html_digest_escapes_text():
+    class Collector(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.links = []
+            self.text = []
+
+        def handle_starttag(self, tag, attrs):
+            if tag == "a":
+                self.links.append(dict(attrs)["href"])
+
+        def handle_data(self, data):
+            self.text.append(data)
+
+    page = render(html_digest)
+    assert "<rise>" not in page
+    collector = Collector()
+    collector.feed(page)
+    assert collector.links == ["http://a/1?x=1&y=2", "http://a/2", "http://b/1"]
+    assert {"Rates <rise>", 'Say "hi"', "Short & sweet", "News", "Tech"} <= set(
+        collector.text
+    )
+
+
+def test_failed_digest_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "digest.md"
+    path.write_text("previous")
+
+    def failing():
+        yield "partial"
+        raise RuntimeError("database went away")
+
+    with pytest.raises(RuntimeError):
+        _write_chunks(failing(), str(path))
+    assert path.read_text() == "previous"
+    assert [item.name for item in tmp_path.iterdir()] == ["digest.md"]
+
+    _write_chunks(render(markdown_digest), str(path))
+    assert path.read_text().startswith("# RSS Digest")
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from email.utils import format_datetime
+from urllib.parse import urlparse
+
+from conftest import NOW, FakeTransport
+from core.database import Database
+from core.feed_manager import BODIES
+
+A = "http://example.com/a.xml"
+B = "http://example.com/b.xml"
+
+
+def rss(feed, count=1):
+    published = format_datetime(NOW + timedelta(hours=1))
+    items = "".join(
+        f"<item><guid>{feed}-{i}</guid><title>{feed} {i}</title>"
+        f"<link>http://example.com/{feed}/{i}</link><pubDate>{published}</pubDate>"
+        "<description>Body</description></item>"
+        for i in range(count)
+    )
+    return f"<rss><channel><title>{feed}</title>{items}</channel></rss>".encode()
+
+
+def test_refresh_limits_requests_per_host(manager):
+    slow = [f"http://slow.example/{i}.xml" for i in range(6)]
+    for url in slow:
+        manager.db.add_feed(
+            {"url": url, "title": url, "last_updated": NOW, "enabled": True}
+        )
+    manager.reload_feeds()
+    lock = threading.Lock()
+    active = Counter()
+    most = Counter()
+
+    def hold(url):
+        host = urlparse(url).netloc
+        with lock:
+            active[host] += 1
+            most[host] = max(most[host], active[host])
+        time.sleep(0.05)
+        with lock:
+            active[host] -= 1
+
+    manager.transport = FakeTransport(
+        {url: rss(str(position)) for position, url in enumerate([A, B, *slow])}, hold
+    )
+    results = manager.refresh_all(max_workers=8, per_host_limit=2)
+
+    assert len(results) == 8 and all(result["success"] for result in results)
+    assert most == {"slow.example": 2, "example.com": 2}
+
+
+def test_feed_removed_during_refresh_fails_alone(baseline_db, manager):
+    other = Database(baseline_db)
+
+    def remove_b(url):
+        if url == B:
+            # Another process removes the feed while it is being fetched
+            other.remove_feed(B)
+
+    manager.transport = FakeTransport({A: rss("a"), B: rss("b")}, remove_b)
+    try:
+        results = {
+            result["url"]: result for result in manager.iter_refresh(max_workers=1)
+        }
+    finally:
+        other.close()
+
+    assert results[A]["success"] and results[A]["count"] == 1
+    assert results[B]["status"] == "failed" and not results[B]["success"]
+    assert set(manager.feeds) == {A}
+
+
+def test_feeds_follow_writes_from_other_connections(baseline_db, manager):
+    assert manager.feeds[A]["title"] == "A"
+    other = Database(baseline_db)
+    try:
+        other.update_feed(A, {"title": "Renamed"})
+    finally:
+        other.close()
+    assert manager.feeds[A]["title"] == "Renamed"
+
+
+def test_bodies_are_only_dropped_when_articles_change(baseline_db, manager):
+    entry_id = manager.db.get_feed_entries(B)[0].id
+    body = manager.get_entry_body(entry_id)
+
+    other = Database(baseline_db)
+    try:
+        # Marking entries read elsewhere leaves the cached bodies alone
+        other.mark_entries_read(feed_url=B)
+        assert manager.cache.peek(BODIES, entry_id) == body
+
+        # Editing an article elsewhere drops them
+        other._get_connection().execute(
+            "UPDATE entries SET content = 'Edited' WHERE id = ?", (entry_id,)
+        )
+        other._get_connection().commit()
+        assert manager.cache.peek(BODIES, entry_id) is None
+        assert manager.get_entry_body(entry_id) == "Edited"
+    finally:
+        other.close()
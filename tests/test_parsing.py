@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+from core.parsing import iter_new_entries, parse_new_entries, summarize
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+URL = "http://example.com/feed.xml"
+HEADERS = {"content-type": "application/rss+xml"}
+
+
+def rss(*items):
+    body = "".join(
+        f"<item><title>{title}</title><link>{link}</link>"
+        f"<pubDate>{published}</pubDate></item>"
+        for title, link, published in items
+    )
+    return f"<rss><channel><title>Feed</title>{body}</channel></rss>".encode()
+
+
+def test_streaming_parser_stops_at_old_entries():
+    content = rss(
+        ("New", "http://example.com/new", "Tue, 02 Jan 2024 00:00:00 GMT"),
+        *[
+            (f"Old {i}", f"http://example.com/old/{i}", "Sun, 31 Dec 2023 00:00:00 GMT")
+            for i in range(5)
+        ],
+    )
+    assert [entry["title"] for entry in iter_new_entries(content, SINCE, URL)] == [
+        "New"
+    ]
+
+
+def test_relative_links_are_resolved():
+    content = rss(("Post", "/post/1", "Tue, 02 Jan 2024 00:00:00 GMT"))
+    (entry,) = parse_new_entries(content, HEADERS, URL, SINCE)
+    assert entry["link"] == "http://example.com/post/1"
+    assert entry["guid"] == "http://example.com/post/1"
+
+    atom = b"""<feed xmlns="http://www.w3.org/2005/Atom" xml:base="http://other.org/blog/">
+        <entry><id>1</id><title>A</title><link href="a"/>
+        <updated>2024-01-02T00:00:00Z</updated></entry></feed>"""
+    (entry,) = parse_new_entries(atom, HEADERS, URL, SINCE)
+    assert entry["link"] == "http://other.org/blog/a"
+
+
+def test_unordered_feed_falls_back_to_feedparser():
+    content = rss(
+        ("Older", "http://example.com/1", "Tue, 02 Jan 2024 00:00:00 GMT"),
+        ("Newer", "http://example.com/2", "Wed, 03 Jan 2024 00:00:00 GMT"),
+        ("Old", "http://example.com/3", "Sun, 31 Dec 2023 00:00:00 GMT"),
+    )
+    entries = parse_new_entries(content, HEADERS, URL, SINCE)
+    assert sorted(entry["title"] for entry in entries) == ["Newer", "Older"]
+
+
+def test_documents_without_entries_are_not_feeds():
+    assert (
+        parse_new_entries(b"<html><body>Error</body></html>", HEADERS, URL, SINCE)
+        is None
+    )
+    assert (
+        parse_new_entries(b"<html><body>Error<br></body>", HEADERS, URL, SINCE) is None
+    )
+
+
+def test_summarize_strips_markup_and_caps_length():
+    assert summarize("<p>Fish&nbsp;<b>and</b></p><p>chips</p><script>x()</script>") == (
+        "Fish and chips"
+    )
+    summary = summarize("word " * 200, length=50)
+    assert len(summary) <= 51 and summary.endswith("…")
@@ -0,0 +1,88 @@
+import threading
+
+from core.writer import WriteBehindQueue, group_by_value
+
+
+class RecordingDatabase:
+    """Records the batches written, failing while fail is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def apply_entry_changes(self, read_status, categories):
+        if self.fail:
+            return False
+        self.batches.append((read_status, categories))
+        return True
+
+
+def writer_threads():
+    return [
+        thread for thread in threading.enumerate() if thread.name == "readless-writer"
+    ]
+
+
+def test_group_by_value():
+    assert group_by_value({1: True, "http://a": True, 2: False}) == {
+        True: ([1], ["http://a"]),
+        False: ([2], []),
+    }
+
+
+def test_changes_are_coalesced_into_one_batch():
+    db = RecordingDatabase()
+    written = []
+    queue = WriteBehindQueue(db, interval=60, on_write=lambda: written.append(1))
+    try:
+        queue.set_read_status([1, 2, "http://a"], True)
+        queue.set_read_status(2, False)
+        queue.set_category([1], "Tech")
+        queue.set_category([1], "News")
+        assert db.batches == [] and queue.pending()
+
+        assert queue.flush()
+        assert db.batches == [
+            ({True: ([1], ["http://a"]), False: ([2], [])}, {"News": ([1], [])})
+        ]
+        assert written == [1]
+        assert not queue.pending()
+        # Nothing queued, nothing written
+        assert queue.flush() and len(db.batches) == 1
+    finally:
+        queue.close()
+
+
+def test_failed_batches_are_requeued_without_overriding_newer_changes():
+    db = RecordingDatabase()
+    queue = WriteBehindQueue(db, interval=60)
+    try:
+        queue.set_read_status([1, 2], True)
+        db.fail = True
+        assert not queue.flush()
+        assert queue.pending()
+
+        queue.set_read_status([2], False)
+        db.fail = False
+        assert queue.flush()
+        assert db.batches == [({True: ([1], []), False: ([2], [])}, {})]
+    finally:
+        queue.close()
+
+
+def test_thread_starts_with_the_first_change_and_close_writes_the_rest():
+    db = RecordingDatabase()
+    queue = WriteBehindQueue(db, interval=60)
+    assert queue._thread is None
+    queue.set_category(["http://a"], "Tech")
+    assert queue._thread in writer_threads()
+
+    assert queue.close()
+    assert not queue._thread.is_alive()
+    assert db.batches == [({}, {"Tech": ([], ["http://a"])})]
+
+
+def test_closing_an_unused_queue_starts_no_thread():
+    queue = WriteBehindQueue(RecordingDatabase())
+    assert queue.close()
+    assert queue._thread is None